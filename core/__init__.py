@@ -1,5 +1,6 @@
 # core/__init__.py
-from .alocador_bobinagem import AlocadorBobinagemReal
+from .alocador_bobinagem import AlocadorBobinagemReal, PrazoEsgotado
+from .restricoes import EstadoRestricoes
 from .validador import ValidadorAlocacao
 
-__all__ = ["AlocadorBobinagemReal", "ValidadorAlocacao"]
+__all__ = ["AlocadorBobinagemReal", "PrazoEsgotado", "EstadoRestricoes", "ValidadorAlocacao"]
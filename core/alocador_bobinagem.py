@@ -8,14 +8,19 @@ Orquestração da bobinagem por camadas:
 
 from __future__ import annotations
 import math
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, Tuple
 
-from core.validador import ValidadorAlocacao
 from models import Camada
-from core.selecionador_faixas import ItemFaixa, selecionar_faixas
+from core.selecionador_faixas import CacheTabelas, ItemFaixa, montar_tabela
 from core.geometria_camadas import registrar_na_camada
-from core.restricoes import checar_elegibilidade, limites_por_linha
+from core.restricoes import EstadoRestricoes, checar_elegibilidade
 from core.objetivos import valor_largura_comprimento  # escolha padrão do objetivo
+from core.busca_lookahead import BuscaLookahead
+
+class PrazoEsgotado(Exception):
+    """O prazo (relógio de parede) de alocar_em_bobina/alocar_frota passou; checado entre camadas."""
+
 
 class AlocadorBobinagemReal:
     """
@@ -26,6 +31,42 @@ class AlocadorBobinagemReal:
 
     MARGEM_FRAC = 0.05
     EPS = 1e-9
+    TABELAS_MAX = 16   # tabelas de knapsack mantidas para reuso entre bobinas
+    VALOR_FN = staticmethod(valor_largura_comprimento)  # troque aqui se quiser outro objetivo
+
+    def __init__(self, backend: Optional[str] = None, lookahead: int = 0,
+                 orcamento_cpu_s: Optional[float] = None, ramos_max: int = 4,
+                 orcamento_memoria_mb: Optional[float] = None):
+        """
+        backend: backend do knapsack; None = autotuning por tamanho (core.backends_mochila).
+        lookahead: nº de camadas avaliadas à frente antes de fixar cada camada
+                   (0 = guloso, camada a camada). Ver core.busca_lookahead.
+        orcamento_cpu_s: tempo de CPU máximo da busca por bobina (None = sem limite).
+        ramos_max: alternativas de camada exploradas por nível da busca.
+        orcamento_memoria_mb: teto de memória do planejamento. Metade vai para a
+                   tabela de uma camada (acima disso, DP em blocos) e metade para
+                   o cache de tabelas entre bobinas. None = sem limite.
+        """
+        self.backend = backend
+        self.lookahead = lookahead
+        self.orcamento_cpu_s = orcamento_cpu_s
+        self.ramos_max = ramos_max
+        self.orcamento_memoria_mb = orcamento_memoria_mb
+        # cache LRU entre bobinas: catálogo de itens da camada -> TabelaFaixas resolvida até alguma largura
+        self._tabelas = CacheTabelas(self.TABELAS_MAX)
+
+    def _limite_bytes(self) -> Optional[int]:
+        """Parcela do orçamento de memória para tabelas (uma camada / cache), em bytes."""
+        if self.orcamento_memoria_mb is None:
+            return None
+        return int(self.orcamento_memoria_mb * (1 << 20)) // 2
+
+    def _limite_cache(self) -> Optional[int]:
+        """Bytes de cada cache de tabelas; com busca à frente, a parcela é dividida com o cache da busca."""
+        limite = self._limite_bytes()
+        if limite is None or self.lookahead <= 0:
+            return limite
+        return limite // 2
 
     # ---------- helpers de unidade e geometria ----------
     @staticmethod
@@ -48,13 +89,114 @@ class AlocadorBobinagemReal:
     def _comprimento(L) -> float:
         return float(getattr(L, "comprimento", 0.0) or 0.0)
 
+    # ---------- knapsack com tabela compartilhada ----------
+    def _selecionar(self, itens: List[ItemFaixa], largura_m: float, valor_fn,
+                    cache: Optional[CacheTabelas] = None) -> Tuple[Dict[object, int], Optional[str]]:
+        """
+        selecionar_faixas com reuso: se o mesmo catálogo (linhas, passos,
+        valores e limites) já foi resolvido para uma largura >= largura_m,
+        a seleção sai da tabela existente sem refazer a DP.
+        cache: onde guardar a tabela (padrão: o cache entre bobinas do alocador).
+        Retorna (escolhas, backend que resolveu a tabela).
+        """
+        W = int(round(largura_m * 1000.0))
+        if W <= 0 or not itens:
+            return {}, None
+        # chave independente da largura: a mesma tabela serve a bobinas mais estreitas
+        chave = tuple(
+            (id(t.linha), int(round(t.passo_m * 1000.0)),
+             valor_fn(t.passo_m, t.comp_por_faixa_m, t.sobra_linha_m), t.qtd_max)
+            for t in itens
+        )
+        if cache is None:
+            cache = self._tabelas
+        tabela = cache.obter(chave, W)
+        if tabela is None:
+            tabela = montar_tabela(itens, largura_m, valor_fn, backend=self.backend,
+                                   memoria_max_bytes=self._limite_bytes())
+            if tabela is None:
+                return {}, None
+            # LRU por quantidade e, com orçamento, por bytes
+            cache.guardar(chave, tabela, self._limite_cache())
+        return tabela.selecionar(largura_m), tabela.backend
+
+    def alocar_frota(self, bobinas, linhas, prazo: Optional[float] = None):
+        """
+        Aloca as mesmas 'linhas' em cada bobina (como alocar_em_bobina, bobina a bobina),
+        processando da mais larga para a mais estreita para que as camadas com
+        catálogo idêntico reaproveitem a tabela de knapsack da bobina mais larga.
+        prazo: instante (time.time()) a partir do qual levanta PrazoEsgotado.
+        Retorna [(bobina, linhas_nao_alocadas), ...] na ordem de entrada.
+        """
+        bobinas = list(bobinas)
+        ordem = sorted(range(len(bobinas)),
+                       key=lambda i: -float(getattr(bobinas[i], "largura", 0.0) or 0.0))
+        resultados = [None] * len(bobinas)
+        for i in ordem:
+            resultados[i] = self.alocar_em_bobina(bobinas[i], linhas, prazo)
+        return resultados
+
+    def _montar_itens(self, restricoes: EstadoRestricoes, linhas_ord, rem: Dict[int, float], r_base_m: float,
+                      de_total_m: float) -> Tuple[List[ItemFaixa], Dict[object, tuple]]:
+        """
+        Cataloga as faixas elegíveis da camada que começa em r_base_m.
+        'restricoes' só é lido (peso/volume já usados), o que permite simular estados.
+        Retorna (itens, props) com props[linha] = (r_mid, comp_por_faixa, passo).
+        """
+        EPS = self.EPS
+        # (linha, r_mid, comp_por_faixa, passo, d_m, rem) das linhas geometricamente elegíveis
+        elegiveis = []
+
+        for L in linhas_ord:
+            rem_L = rem[id(L)]
+            if rem_L <= EPS:
+                continue
+
+            d_m = self._d_real_m(L)
+            if d_m <= EPS:
+                continue
+
+            r_mid_m = checar_elegibilidade(restricoes, L, r_base_m, d_m, de_total_m)
+            if r_mid_m is None:
+                continue
+
+            elegiveis.append((L, r_mid_m, self._circ(r_mid_m), self._passo(d_m), d_m, rem_L))
+
+        # limites por remanescente/peso/volume de todas as linhas numa chamada
+        qtds = restricoes.limites(
+            [e[0] for e in elegiveis], [e[2] for e in elegiveis], [e[5] for e in elegiveis]
+        )
+
+        itens: List[ItemFaixa] = []
+        props: Dict[object, tuple] = {}
+        for (L, r_mid_m, comp_por_faixa_m, passo_m, d_m, rem_L), qtd_max in zip(elegiveis, qtds):
+            if qtd_max <= 0:
+                continue
+
+            itens.append(
+                ItemFaixa(
+                    linha=L,
+                    passo_m=passo_m,
+                    comp_por_faixa_m=comp_por_faixa_m,
+                    qtd_max=qtd_max,
+                    r_mid_m=r_mid_m,
+                    d_m=d_m,
+                    sobra_linha_m=rem_L
+                )
+            )
+            props[L] = (r_mid_m, comp_por_faixa_m, passo_m)
+
+        return itens, props
+
     # ---------- algoritmo principal ----------
-    def alocar_em_bobina(self, bobina, linhas):
+    def alocar_em_bobina(self, bobina, linhas, prazo: Optional[float] = None):
         """
         Aloca 'linhas' na 'bobina' camada a camada:
           1) cataloga faixas elegíveis,
           2) resolve knapsack para maximizar a largura ocupada,
           3) registra camada e avança o raio.
+        prazo: instante (time.time()) a partir do qual, antes da próxima camada,
+               levanta PrazoEsgotado (a bobina fica incompleta). None = sem prazo.
         Retorna: (bobina, linhas_nao_alocadas)
         """
         EPS = self.EPS
@@ -81,9 +223,14 @@ class AlocadorBobinagemReal:
         # Remanescente por linha (m)
         rem: Dict[int, float] = {id(L): self._comprimento(L) for L in linhas_ord}
 
-        val = ValidadorAlocacao()
+        restricoes = EstadoRestricoes(bobina, linhas_ord)
         lado_inicio = "esquerda"
         linhas_nao: List[object] = []
+        busca = None
+        if self.lookahead > 0:
+            busca = BuscaLookahead(self, linhas_ord, de_total_m, largura_m, restricoes,
+                                   profundidade=self.lookahead, orcamento_cpu_s=self.orcamento_cpu_s,
+                                   ramos_max=self.ramos_max)
 
         # Loop de camadas
         while True:
@@ -94,60 +241,26 @@ class AlocadorBobinagemReal:
                 break
             if largura_m <= EPS:
                 break
+            if prazo is not None and time.time() > prazo:
+                raise PrazoEsgotado(f"Prazo esgotado após {len(bobina.camadas)} camada(s)")
 
             # Monta catálogo de itens elegíveis
-            itens: List[ItemFaixa] = []
-            props: Dict[object, tuple] = {}  # props[linha] = (r_mid, comp_por_faixa, passo)
-
-            for L in linhas_ord:
-                rem_L = rem[id(L)]
-                if rem_L <= EPS:
-                    continue
-
-                d_m = self._d_real_m(L)
-                if d_m <= EPS:
-                    continue
-
-                r_mid_m = checar_elegibilidade(bobina, L, r_base_m, d_m, de_total_m)
-                if r_mid_m is None:
-                    continue
-
-                passo_m = self._passo(d_m)
-                comp_por_faixa_m = self._circ(r_mid_m)
-
-                qtd_max = limites_por_linha(
-                    bobina=bobina,
-                    linha=L,
-                    comp_por_faixa_m=comp_por_faixa_m,
-                    rem_linha_m=rem_L,
-                    validador=val
-                )
-                if qtd_max <= 0:
-                    continue
-
-                itens.append(
-                    ItemFaixa(
-                        linha=L,
-                        passo_m=passo_m,
-                        comp_por_faixa_m=comp_por_faixa_m,
-                        qtd_max=qtd_max,
-                        r_mid_m=r_mid_m,
-                        d_m=d_m,
-                        sobra_linha_m=rem_L
-                    )
-                )
-                props[L] = (r_mid_m, comp_por_faixa_m, passo_m)
+            itens, props = self._montar_itens(restricoes, linhas_ord, rem, r_base_m, de_total_m)
 
             if not itens:
                 # nenhuma linha cabe nesta camada com o raio atual
                 break
 
-            # 1) Seleção ótima por knapsack (largura + comprimento como desempate)
-            escolhas = selecionar_faixas(
-                itens=itens,
-                largura_m=largura_m,
-                valor_fn=valor_largura_comprimento,  # troque aqui se quiser outro objetivo
-            )
+            # 1) Seleção ótima por knapsack (largura + comprimento como desempate),
+            #    ou busca à frente sobre as próximas camadas, se habilitada
+            if busca is not None:
+                escolhas, backend = busca.escolher(itens, props, r_base_m, rem)
+            else:
+                escolhas, backend = self._selecionar(
+                    itens=itens,
+                    largura_m=largura_m,
+                    valor_fn=self.VALOR_FN,
+                )
 
             if not escolhas:
                 # por segurança (não deveria ocorrer se itens existirem)
@@ -155,6 +268,7 @@ class AlocadorBobinagemReal:
 
             # 2) Registro geométrico da camada
             camada = Camada(diametro_base=2.0 * r_base_m)
+            camada.backend_mochila = backend
             maior_d_m = registrar_na_camada(
                 camada=camada,
                 escolhas=escolhas,
@@ -176,6 +290,7 @@ class AlocadorBobinagemReal:
 
             # 3) Empilha a camada na bobina e avança raio
             bobina.adicionar_camada(camada)
+            restricoes.registrar_camada(camada)
             r_base_m += maior_d_m
             lado_inicio = "direita" if lado_inicio == "esquerda" else "esquerda"
 
@@ -0,0 +1,295 @@
+"""
+Backends do knapsack por camada e escolha automática por tamanho.
+
+Todos os backends resolvem exatamente a mesma DP (mochila limitada por
+linha, faixas testadas em ordem crescente, troca só com melhora estrita)
+e devolvem (dp, contagens) idênticos; muda apenas o custo:
+  - "python": laços puros, sem dependências (sempre disponível);
+  - "numpy":  uma operação vetorizada por (linha, nº de faixas);
+  - "numba":  laços compilados por JIT, se o numba estiver instalado.
+
+O AutoAjuste mede os backends disponíveis em tamanhos representativos na
+primeira vez em que é usado, grava os limiares de troca num JSON local e,
+daí em diante, despacha cada camada para o backend mais rápido.
+Variáveis de ambiente:
+  ALOCADOR_BACKEND_MOCHILA  força um backend ("python", "numpy", "numba");
+  ALOCADOR_LIMIARES_MOCHILA caminho do JSON de limiares.
+"""
+
+from __future__ import annotations
+import json
+import os
+import random
+import tempfile
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# backend(dp, pesos, valores, qtds) -> (dp_novo, contagens)
+Backend = Callable[[List[int], Sequence[int], Sequence[int], Sequence[int]], Tuple[List[int], list]]
+
+LIMITE_INT64 = 1 << 62   # folga para somas em int64 nos backends vetorizados/compilados
+
+
+def _tipo_contagem(qtd: int) -> str:
+    """Menor typecode de array que comporta 'qtd' faixas."""
+    if qtd < (1 << 8):
+        return 'B'
+    if qtd < (1 << 16):
+        return 'H'
+    return 'L'
+
+
+def _cabe_int64(dp: Sequence[int], pesos: Sequence[int], valores: Sequence[int]) -> bool:
+    """Garante que nenhum valor da DP estoura int64 (senão o resultado divergiria do Python)."""
+    W = len(dp) - 1
+    teto = max(dp) + sum(v * (W // w) for w, v in zip(pesos, valores))
+    return teto < LIMITE_INT64 and min(valores, default=0) >= 0
+
+
+# ---------- python ----------
+def resolver_lote_python(
+    dp: List[int],
+    pesos: Sequence[int],
+    valores: Sequence[int],
+    qtds: Sequence[int],
+) -> Tuple[List[int], List[array]]:
+    """
+    Mochila limitada por linha (grupo), a partir de um dp já existente.
+    dp[w] = melhor valor com largura EXATA w (mm), -1 = inalcançável.
+    Para cada linha i devolve contagens[i][w] = faixas de i usadas no ótimo
+    de capacidade w (0 = linha não usada), base da reconstrução.
+    """
+    W = len(dp) - 1
+    contagens: List[array] = []
+    for w_mm, v, q in zip(pesos, valores, qtds):
+        novo = list(dp)
+        cnt = array(_tipo_contagem(q), [0]) * (W + 1)
+        for w in range(w_mm, W + 1):
+            melhor = novo[w]
+            bc = 0
+            for c in range(1, min(q, w // w_mm) + 1):
+                p = dp[w - c * w_mm]
+                if p != -1:
+                    cand = p + c * v
+                    if cand > melhor:
+                        melhor = cand
+                        bc = c
+            if bc:
+                novo[w] = melhor
+                cnt[w] = bc
+        dp = novo
+        contagens.append(cnt)
+    return dp, contagens
+
+
+# ---------- numpy ----------
+def _criar_backend_numpy() -> Optional[Backend]:
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    def resolver_lote_numpy(dp, pesos, valores, qtds):
+        if not _cabe_int64(dp, pesos, valores):
+            return resolver_lote_python(list(dp), pesos, valores, qtds)
+        atual = np.asarray(dp, dtype=np.int64)
+        W = len(atual) - 1
+        contagens = []
+        for w_mm, v, q in zip(pesos, valores, qtds):
+            novo = atual.copy()
+            cnt = np.zeros(W + 1, dtype=np.dtype(_tipo_contagem(q)))
+            for c in range(1, min(q, W // w_mm) + 1):
+                s = c * w_mm
+                ant = atual[:W + 1 - s]
+                cand = np.where(ant != -1, ant + c * v, -1)
+                alvo = novo[s:]
+                melhora = cand > alvo
+                alvo[melhora] = cand[melhora]
+                cnt[s:][melhora] = c
+            atual = novo
+            contagens.append(cnt)
+        return atual.tolist(), contagens
+
+    return resolver_lote_numpy
+
+
+# ---------- numba (opcional) ----------
+def _criar_backend_numba() -> Optional[Backend]:
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        return None
+
+    @numba.njit(cache=True)
+    def _kernel(atual, novo, cnt, w_mm, v, q):
+        W = atual.shape[0] - 1
+        for w in range(w_mm, W + 1):
+            melhor = novo[w]
+            bc = 0
+            for c in range(1, min(q, w // w_mm) + 1):
+                p = atual[w - c * w_mm]
+                if p != -1:
+                    cand = p + c * v
+                    if cand > melhor:
+                        melhor = cand
+                        bc = c
+            if bc:
+                novo[w] = melhor
+                cnt[w] = bc
+
+    def resolver_lote_numba(dp, pesos, valores, qtds):
+        if not _cabe_int64(dp, pesos, valores):
+            return resolver_lote_python(list(dp), pesos, valores, qtds)
+        atual = np.asarray(dp, dtype=np.int64)
+        W = len(atual) - 1
+        contagens = []
+        for w_mm, v, q in zip(pesos, valores, qtds):
+            novo = atual.copy()
+            cnt = np.zeros(W + 1, dtype=np.dtype(_tipo_contagem(q)))
+            _kernel(atual, novo, cnt, int(w_mm), int(v), int(q))
+            atual = novo
+            contagens.append(cnt)
+        return atual.tolist(), contagens
+
+    return resolver_lote_numba
+
+
+# ---------- registro ----------
+_BACKENDS: "OrderedDict[str, Backend]" = OrderedDict()
+
+
+def registrar_backend(nome: str, fn: Optional[Backend]) -> None:
+    """Registra um backend (None = indisponível neste ambiente, ignorado)."""
+    if fn is not None:
+        _BACKENDS[nome] = fn
+
+
+def backends_disponiveis() -> List[str]:
+    return list(_BACKENDS)
+
+
+registrar_backend("python", resolver_lote_python)
+registrar_backend("numpy", _criar_backend_numpy())
+registrar_backend("numba", _criar_backend_numba())
+
+
+def trabalho(W: int, pesos: Sequence[int], qtds: Sequence[int]) -> int:
+    """Medida de tamanho do problema: células (w, faixa) visitadas pela DP."""
+    return (W + 1) * sum(min(q, W // w) for w, q in zip(pesos, qtds) if w > 0)
+
+
+# ---------- autotuning ----------
+class AutoAjuste:
+    """
+    Limiares de troca entre backends por 'trabalho' (ver trabalho()).
+    limiares = [(trabalho_min, nome), ...] crescente: usa-se o último com trabalho_min <= trabalho.
+    """
+
+    # (nº de linhas, largura mm, faixas por linha): de camadas mínimas a bobinas de 5 m com muitas linhas
+    TAMANHOS = [(2, 500, 3), (3, 1500, 8), (6, 2500, 15), (12, 3300, 25), (24, 5000, 40), (48, 5000, 60)]
+    REPETICOES = 3
+
+    def __init__(self, arquivo: Optional[str] = None):
+        padrao = Path.home() / ".cache" / "section_allocator" / "limiares_mochila.json"
+        self.arquivo = Path(arquivo or os.environ.get("ALOCADOR_LIMIARES_MOCHILA", padrao))
+        self.limiares: Optional[List[Tuple[int, str]]] = None
+
+    def escolher(self, W: int, pesos: Sequence[int], qtds: Sequence[int]) -> str:
+        forcado = os.environ.get("ALOCADOR_BACKEND_MOCHILA")
+        if forcado in _BACKENDS:
+            return forcado
+        if len(_BACKENDS) == 1:
+            return next(iter(_BACKENDS))
+        if self.limiares is None:
+            self.limiares = self._carregar() or self.calibrar()
+        t = trabalho(W, pesos, qtds)
+        nome = self.limiares[0][1]
+        for t_min, n in self.limiares:
+            if t >= t_min:
+                nome = n
+        return nome
+
+    def _carregar(self) -> Optional[List[Tuple[int, str]]]:
+        try:
+            dados = json.loads(self.arquivo.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if sorted(dados.get("backends", [])) != sorted(_BACKENDS):
+            return None  # ambiente mudou: recalibra
+        limiares = [(int(t), str(n)) for t, n in dados.get("limiares", []) if n in _BACKENDS]
+        return limiares or None
+
+    def calibrar(self) -> List[Tuple[int, str]]:
+        """Mede todos os backends nos TAMANHOS e grava os limiares (melhor esforço)."""
+        rnd = random.Random(0)
+        limiares: List[Tuple[int, str]] = []
+        for n, W, q in self.TAMANHOS:
+            pesos = [rnd.randint(60, 350) for _ in range(n)]
+            valores = [p * 1_000_000 + rnd.randint(1000, 30000) for p in pesos]
+            qtds = [min(q, W // p) for p in pesos]
+            tempos = {}
+            for nome, fn in _BACKENDS.items():
+                dp = [-1] * (W + 1)
+                dp[0] = 0
+                fn(dp, pesos[:1], valores[:1], qtds[:1])  # aquece (JIT, imports)
+                melhor = float("inf")
+                for _ in range(self.REPETICOES):
+                    t0 = time.perf_counter()
+                    fn(dp, pesos, valores, qtds)
+                    melhor = min(melhor, time.perf_counter() - t0)
+                tempos[nome] = melhor
+            vencedor = min(tempos, key=tempos.get)
+            if not limiares:
+                limiares.append((0, vencedor))
+            elif limiares[-1][1] != vencedor:
+                limiares.append((trabalho(W, pesos, qtds), vencedor))
+        try:
+            self._gravar({"backends": list(_BACKENDS), "limiares": limiares})
+        except OSError:
+            pass  # sem disco gravável: os limiares valem só para este processo
+        return limiares
+
+    def _gravar(self, dados) -> None:
+        """Grava num temporário do mesmo diretório e troca com os.replace: leitores concorrentes
+        (outros processos calibrando ou carregando) nunca veem um JSON pela metade."""
+        self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=self.arquivo.name + ".", suffix=".tmp", dir=self.arquivo.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(dados, f)
+            os.replace(tmp, self.arquivo)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+AUTO_AJUSTE = AutoAjuste()
+
+
+def resolver_lote(
+    dp: List[int],
+    pesos: Sequence[int],
+    valores: Sequence[int],
+    qtds: Sequence[int],
+    backend: Optional[str] = None,
+) -> Tuple[List[int], list, str]:
+    """Resolve o lote no backend indicado (ou no escolhido pelo autotuning). Retorna (dp, contagens, backend)."""
+    if backend is None:
+        backend = AUTO_AJUSTE.escolher(len(dp) - 1, pesos, qtds)
+    elif backend not in _BACKENDS:
+        raise ValueError(f"Backend de knapsack indisponível: {backend!r} (disponíveis: {backends_disponiveis()})")
+    dp, contagens = _BACKENDS[backend](dp, pesos, valores, qtds)
+    return dp, contagens, backend
+
+
+__all__ = [
+    "AutoAjuste", "AUTO_AJUSTE", "backends_disponiveis", "registrar_backend",
+    "resolver_lote", "resolver_lote_python", "trabalho",
+]
@@ -0,0 +1,226 @@
+"""
+Busca à frente (lookahead) sobre as próximas camadas de uma bobina.
+
+O modo padrão decide cada camada sozinha (knapsack de largura). Aqui cada
+camada candidata é avaliada pelo que ela permite alocar nas k camadas
+seguintes: uma linha grossa colocada cedo pode "gastar" raio e deixar menos
+volume útil para o resto.
+
+- Ramificação: o ótimo de largura com todas as linhas e os ótimos restritos
+  a linhas de diâmetro <= d (para cada diâmetro distinto), i.e. camadas mais
+  finas que trocam um pouco de largura por raio.
+- Valor: volume de linha alocado (m³) nas camadas exploradas.
+- DFS limitada a k camadas, com tabela de transposição sobre o estado
+  (r_base, remanescentes, peso e volume usados) e a profundidade restante:
+  estado repetido com o mesmo horizonte não é expandido de novo.
+- Poda por cota superior de volume (capacidade volumétrica restante, peso
+  restante, remanescente das linhas e anel geométrico restante).
+- Orçamento de CPU por bobina, checado antes de cada knapsack (também ao
+  gerar as alternativas) e a cada nó: esgotado, a camada candidata já
+  avaliada por completo (o guloso vem primeiro) é usada e o resto da bobina
+  volta ao modo guloso.
+- As tabelas das alternativas restritas ficam num cache próprio da busca
+  (descartado com a bobina); só o ótimo com todas as linhas usa o cache
+  entre bobinas do alocador.
+"""
+
+from __future__ import annotations
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from core.selecionador_faixas import CacheTabelas
+
+EPS = 1e-9
+
+
+class _OrcamentoEsgotado(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class EstadoBusca:
+    r_base_m: float
+    rem: Tuple[float, ...]      # remanescente por linha (ordem de linhas_ord)
+    peso_ton: float             # peso já usado na bobina
+    volume_m3: float            # volume já usado na bobina
+
+    def chave(self) -> tuple:
+        """Chave da tabela de transposição (arredondada para absorver ruído de ponto flutuante)."""
+        return (
+            round(self.r_base_m * 1e6),
+            tuple(round(r * 1e3) for r in self.rem),
+            round(self.peso_ton * 1e6),
+            round(self.volume_m3 * 1e9),
+        )
+
+
+class BuscaLookahead:
+    """DFS limitada sobre as próximas camadas de UMA bobina (ver docstring do módulo)."""
+
+    TENTATIVAS_POR_RAMO = 2   # diâmetros tentados por alternativa distinta (teto de knapsacks por nó)
+
+    def __init__(self, alocador, linhas_ord, de_total_m: float, largura_m: float, restricoes,
+                 profundidade: int = 2, orcamento_cpu_s: Optional[float] = None, ramos_max: int = 4):
+        self.alocador = alocador
+        self.linhas_ord = list(linhas_ord)
+        self.de_total_m = de_total_m
+        self.largura_m = largura_m
+        self.restricoes = restricoes   # EstadoRestricoes da bobina real (só leitura)
+        self.profundidade = max(1, int(profundidade))
+        self.ramos_max = max(1, int(ramos_max))
+        self.limite_cpu = (time.process_time() + orcamento_cpu_s) if orcamento_cpu_s is not None else None
+        self.esgotado = False
+        # (chave do estado, profundidade restante) -> melhor ganho; só a mesma profundidade é reaproveitada,
+        # já que o valor de um horizonte maior não vale para um menor (nem o contrário)
+        self.tt: Dict[Tuple[tuple, int], float] = {}
+        self.nos_expandidos = 0
+        self._cache = CacheTabelas(alocador.TABELAS_MAX)
+
+        # constantes por linha
+        self._d = [self._d_m(L) for L in self.linhas_ord]
+        self._area = [math.pi * (d / 2.0) ** 2 for d in self._d]
+        self._kgpm = [float(getattr(L, "peso_por_metro_kg", 0.0) or 0.0) for L in self.linhas_ord]
+        self._idx = {id(L): i for i, L in enumerate(self.linhas_ord)}
+
+    @staticmethod
+    def _d_m(L) -> float:
+        return float(getattr(L, "diametro", 0.0) or 0.0) / 1000.0
+
+    def _checar_orcamento(self) -> None:
+        if self.esgotado or (self.limite_cpu is not None and time.process_time() > self.limite_cpu):
+            raise _OrcamentoEsgotado()
+
+    # ---------- interface com o alocador ----------
+    def escolher(self, itens, props, r_base_m: float, rem: Dict[int, float]):
+        """Escolhe a camada atual (escolhas, backend) olhando 'profundidade' camadas à frente."""
+        a = self.alocador
+        try:
+            candidatos = self._candidatos(itens)
+        except _OrcamentoEsgotado:
+            self.esgotado = True
+            return a._selecionar(itens, self.largura_m, a.VALOR_FN)
+        if len(candidatos) <= 1:
+            return candidatos[0] if candidatos else ({}, None)
+
+        estado = EstadoBusca(
+            r_base_m=r_base_m,
+            rem=tuple(rem[id(L)] for L in self.linhas_ord),
+            peso_ton=self.restricoes.peso_atual_ton,
+            volume_m3=self.restricoes.volume_usado_m3,
+        )
+        melhor, melhor_valor = candidatos[0], -1.0
+        try:
+            for escolhas, backend in candidatos:
+                ganho, novo = self._aplicar(estado, escolhas, props)
+                if novo is None:
+                    continue
+                if ganho + self._cota(novo) <= melhor_valor + EPS:
+                    continue
+                valor = ganho + self._dfs(novo, self.profundidade - 1)
+                if valor > melhor_valor + EPS:
+                    melhor, melhor_valor = (escolhas, backend), valor
+        except _OrcamentoEsgotado:
+            self.esgotado = True
+        return melhor
+
+    # ---------- busca ----------
+    def _dfs(self, estado: EstadoBusca, prof: int) -> float:
+        if prof <= 0 or (2.0 * estado.r_base_m) >= (self.de_total_m - EPS):
+            return 0.0
+        self._checar_orcamento()
+
+        chave = (estado.chave(), prof)
+        visto = self.tt.get(chave)
+        if visto is not None:
+            return visto
+        self.nos_expandidos += 1
+
+        rem = {id(L): r for L, r in zip(self.linhas_ord, estado.rem)}
+        itens, props = self.alocador._montar_itens(
+            self.restricoes.simular(estado.peso_ton, estado.volume_m3),
+            self.linhas_ord, rem, estado.r_base_m, self.de_total_m,
+        )
+        melhor = 0.0
+        for escolhas, _ in self._candidatos(itens):
+            ganho, novo = self._aplicar(estado, escolhas, props)
+            if novo is None:
+                continue
+            if ganho + self._cota(novo) <= melhor + EPS:
+                continue
+            melhor = max(melhor, ganho + self._dfs(novo, prof - 1))
+
+        self.tt[chave] = melhor
+        return melhor
+
+    def _candidatos(self, itens) -> List[tuple]:
+        """
+        Camadas alternativas: ótimo com todas as linhas e ótimos com diâmetro máximo limitado.
+        Tenta no máximo ramos_max * TENTATIVAS_POR_RAMO diâmetros; levanta _OrcamentoEsgotado
+        se o orçamento acabar antes de algum knapsack.
+        """
+        if not itens:
+            return []
+        a = self.alocador
+        vistos = set()
+        candidatos = []
+        diametros = sorted({t.d_m for t in itens}, reverse=True)
+        for k, d_max in enumerate(diametros[:self.ramos_max * self.TENTATIVAS_POR_RAMO]):
+            self._checar_orcamento()
+            if k == 0:
+                # todas as linhas: a mesma camada do modo guloso, no cache entre bobinas
+                escolhas, backend = a._selecionar(itens, self.largura_m, a.VALOR_FN)
+            else:
+                subconjunto = [t for t in itens if t.d_m <= d_max + EPS]
+                escolhas, backend = a._selecionar(subconjunto, self.largura_m, a.VALOR_FN, cache=self._cache)
+            if not escolhas:
+                continue
+            assinatura = frozenset((id(L), f) for L, f in escolhas.items())
+            if assinatura in vistos:
+                continue
+            vistos.add(assinatura)
+            candidatos.append((escolhas, backend))
+            if len(candidatos) >= self.ramos_max:
+                break
+        return candidatos
+
+    def _aplicar(self, estado: EstadoBusca, escolhas, props) -> Tuple[float, Optional[EstadoBusca]]:
+        """Efeito da camada no estado: (volume alocado, novo estado) — None se nada é alocado."""
+        rem = list(estado.rem)
+        peso = estado.peso_ton
+        vol = estado.volume_m3
+        ganho = 0.0
+        maior_d = 0.0
+        for L, faixas in escolhas.items():
+            if faixas <= 0:
+                continue
+            i = self._idx[id(L)]
+            _, comp_por_faixa_m, _ = props[L]
+            comp = faixas * comp_por_faixa_m
+            rem[i] = max(0.0, rem[i] - comp)
+            peso += (self._kgpm[i] * comp) * 0.001
+            v = self._area[i] * comp
+            vol += v
+            ganho += v
+            maior_d = max(maior_d, self._d[i])
+        if maior_d <= EPS:
+            return 0.0, None
+        return ganho, EstadoBusca(estado.r_base_m + maior_d, tuple(rem), peso, vol)
+
+    def _cota(self, estado: EstadoBusca) -> float:
+        """Cota superior do volume que ainda pode entrar na bobina a partir de 'estado'."""
+        r_ext = self.de_total_m / 2.0
+        anel = math.pi * max(0.0, r_ext ** 2 - estado.r_base_m ** 2) * self.largura_m
+        por_volume = max(0.0, self.restricoes.volume_cap_m3 - estado.volume_m3)
+        por_linhas = sum(r * a for r, a in zip(estado.rem, self._area))
+        cota = min(anel, por_volume, por_linhas)
+
+        peso_rest_kg = max(0.0, self.restricoes.peso_maximo_ton - estado.peso_ton) * 1000.0
+        razoes = [a / k for r, a, k in zip(estado.rem, self._area, self._kgpm) if r > EPS and k > EPS]
+        if razoes and len(razoes) == sum(1 for r in estado.rem if r > EPS):
+            cota = min(cota, peso_rest_kg * max(razoes))
+        return cota
+
+
+__all__ = ["BuscaLookahead", "EstadoBusca"]
@@ -6,7 +6,7 @@ Converte peso/volume remanescentes para número de FAIXAS (voltas) na camada.
 
 from __future__ import annotations
 import math
-from typing import Optional
+from typing import List, Optional
 
 EPS = 1e-9
 
@@ -50,3 +50,87 @@ def limites_por_linha(bobina, linha, comp_por_faixa_m: float, rem_linha_m: float
 
     qtd_max = max(0, min(max_by_rem, max_by_peso, max_by_vol))
     return qtd_max
+
+
+class EstadoRestricoes:
+    """
+    Estado compacto de peso/volume de UMA bobina durante a alocação.
+    Faz as mesmas contas do ValidadorAlocacao (que segue como referência),
+    mas lê as capacidades da bobina uma única vez, guarda a área de seção e
+    o kg/m de cada linha e atualiza peso/volume usados incrementalmente a cada
+    camada gravada, em vez de recalcular tudo por linha e por camada.
+    """
+
+    def __init__(self, bobina, linhas=(), _tabelas=None):
+        self.peso_maximo_ton = bobina.peso_maximo_ton
+        self.volume_cap_m3 = bobina.volume_cap_m3
+        self.peso_atual_ton = bobina.peso_atual_ton
+        self.volume_usado_m3 = bobina.volume_usado_m3
+        # por linha (id): (kg/m efetivo, área de seção efetiva) — compartilhado entre simulações
+        self._por_linha = _tabelas if _tabelas is not None else {}
+        for L in linhas:
+            self._constantes(L)
+
+    def _constantes(self, linha):
+        c = self._por_linha.get(id(linha))
+        if c is None:
+            area = linha.area_m2
+            c = (max(1e-12, linha.peso_por_metro_kg), max(1e-12, area), area)
+            self._por_linha[id(linha)] = c
+        return c
+
+    def simular(self, peso_atual_ton: float, volume_usado_m3: float) -> "EstadoRestricoes":
+        """Cópia leve com outro peso/volume usados (para busca à frente)."""
+        novo = EstadoRestricoes.__new__(EstadoRestricoes)
+        novo.peso_maximo_ton = self.peso_maximo_ton
+        novo.volume_cap_m3 = self.volume_cap_m3
+        novo.peso_atual_ton = peso_atual_ton
+        novo.volume_usado_m3 = volume_usado_m3
+        novo._por_linha = self._por_linha
+        return novo
+
+    # -------- limites (m) --------
+    def max_comprimento_por_peso(self, linha) -> float:
+        cap_ton = self.peso_maximo_ton - self.peso_atual_ton
+        if cap_ton <= 0: return 0.0
+        return (cap_ton * 1000.0) / self._constantes(linha)[0]
+
+    def max_comprimento_por_volume(self, linha) -> float:
+        cap = self.volume_cap_m3 - self.volume_usado_m3
+        if cap <= 0: return 0.0
+        return cap / self._constantes(linha)[1]
+
+    def limites(self, linhas, comps_por_faixa_m, rems_m) -> List[int]:
+        """
+        Versão em lote de limites_por_linha: nº máximo de faixas de cada linha
+        na camada (remanescente, peso e volume), com as capacidades restantes
+        calculadas uma vez para todas as linhas.
+        """
+        cap_ton = self.peso_maximo_ton - self.peso_atual_ton
+        cap_kg = cap_ton * 1000.0 if cap_ton > 0 else 0.0
+        cap_vol = self.volume_cap_m3 - self.volume_usado_m3
+        if cap_vol <= 0: cap_vol = 0.0
+        floor = math.floor
+        qtds: List[int] = []
+        for L, comp, rem in zip(linhas, comps_por_faixa_m, rems_m):
+            if comp <= EPS:
+                qtds.append(0)
+                continue
+            kgpm, area, _ = self._constantes(L)
+            qtds.append(max(0, min(
+                int(floor(rem / comp)),
+                int(floor((cap_kg / kgpm if cap_kg else 0.0) / comp)),
+                int(floor((cap_vol / area if cap_vol else 0.0) / comp)),
+            )))
+        return qtds
+
+    # -------- atualização incremental --------
+    def registrar_camada(self, camada):
+        """Acumula peso/volume da camada gravada (mesmas contas de Bobina.adicionar_camada)."""
+        for reg in camada.linhas:
+            L = reg['objeto']
+            comp = reg.get('comprimento_alocado', None)
+            if comp is None:
+                comp = L.comprimento  # retrocompat
+            self.peso_atual_ton += (L.peso_por_metro_kg * comp) * 0.001
+            self.volume_usado_m3 += self._constantes(L)[2] * comp
@@ -1,13 +1,26 @@
-# core/selecionador_faixas.py
 """
 Knapsack (mochila inteira) por camada.
 Recebe "itens" (faixas possíveis por linha) e devolve quantas faixas
 de cada linha usar para maximizar a LARGURA ocupada (com desempate opcional).
+
+A tabela da DP calculada para a largura W_max já contém o ótimo de toda
+largura menor (dp[0..W]); TabelaFaixas guarda, por linha, quantas faixas
+foram usadas em cada capacidade, o que permite reconstruir a escolha de
+qualquer largura <= W_max a partir de uma única resolução.
+
+Com orçamento de memória (memoria_max_bytes), se a tabela de contagens
+projetada não couber, a DP guarda só o dp no início de cada bloco de itens
+e a reconstrução recalcula as contagens bloco a bloco (do último ao primeiro).
 """
 
 from __future__ import annotations
+import math
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Dict, Callable, Tuple
+from typing import List, Dict, Callable, Iterable, Optional, Tuple
+
+from core.backends_mochila import _tipo_contagem, resolver_lote
 
 @dataclass(frozen=True)
 class ItemFaixa:
@@ -19,59 +32,201 @@ class ItemFaixa:
     d_m: float                  # diâmetro real (m)
     sobra_linha_m: float        # comprimento remanescente (m), usado em empates (opcional)
 
-def selecionar_faixas(
-    itens: List[ItemFaixa],
-    largura_m: float,
-    valor_fn: Callable[[float, float, float | None], int],
-) -> Dict[object, int]:
+
+@dataclass
+class TabelaFaixas:
+    """DP resolvida até W (mm); responde a seleção para qualquer largura <= W."""
+    itens: List[ItemFaixa]
+    pesos: List[int]            # passo de cada item (mm)
+    W: int                      # capacidade máxima resolvida (mm)
+    dp: List[int]
+    contagens: Optional[list]  # contagens[i][w] = faixas do item i no ótimo de capacidade w
+    backend: str = "python"    # backend que resolveu a DP (instrumentação)
+    # modo em blocos (orçamento de memória): contagens=None, guarda dp no início de cada bloco
+    valores: Optional[List[int]] = None
+    qtds: Optional[List[int]] = None
+    pontos: Optional[list] = None
+    bloco: int = 0
+
+    def nbytes(self) -> int:
+        """Memória aproximada das estruturas da tabela (bytes)."""
+        n = 8 * (self.W + 1)  # dp
+        if self.contagens is not None:
+            n += sum(len(c) * getattr(c, 'itemsize', 8) for c in self.contagens)
+        if self.pontos is not None:
+            n += sum(len(p) * getattr(p, 'itemsize', 8) for p in self.pontos)
+        return n
+
+    def _contagens_bloco(self, j: int) -> list:
+        a = j * self.bloco
+        b = a + self.bloco
+        _, contagens, _ = resolver_lote(list(self.pontos[j]), self.pesos[a:b], self.valores[a:b],
+                                        self.qtds[a:b], backend=self.backend)
+        return contagens
+
+    def selecionar(self, largura_m: float) -> Dict[object, int]:
+        """Retorna {linha: faixas_escolhidas} ótimo para 'largura_m' (<= W)."""
+        W = int(round(largura_m * 1000.0))
+        if W > self.W:
+            raise ValueError(f"Largura {largura_m} m acima da tabela resolvida ({self.W} mm)")
+        if W <= 0:
+            return {}
+
+        # Melhor capacidade
+        dp = self.dp
+        w_best = max(range(W + 1), key=dp.__getitem__)
+        if dp[w_best] <= 0:
+            return {}
+
+        # Reconstrução (linha a linha, da última para a primeira)
+        usados_por_linha: Dict[object, int] = {}
+        w = w_best
+        contagens, base = self.contagens, 0
+        for i in range(len(self.itens) - 1, -1, -1):
+            if self.contagens is None and (contagens is None or i < base):
+                j = i // self.bloco
+                contagens, base = self._contagens_bloco(j), j * self.bloco
+            c = int(contagens[i - base][w])
+            if c:
+                linha = self.itens[i].linha
+                usados_por_linha[linha] = usados_por_linha.get(linha, 0) + c
+                w -= c * self.pesos[i]
+        return usados_por_linha
+
+
+class CacheTabelas:
     """
-    Resolve a mochila inteira com expansão em itens unitários (bounded -> 0/1).
-    - Capacidade W = largura_m em mm
-    - Para cada cópia de faixa: peso = passo_mm, valor = valor_fn(...)
-    Retorna: {linha: faixas_escolhidas}
+    LRU de TabelaFaixas por catálogo de itens (chave independente da largura),
+    limitado em quantidade e, se houver orçamento, em bytes.
     """
-    W = int(round(largura_m * 1000.0))
-    if W <= 0 or not itens:
-        return {}
 
-    # Expansão de itens unitários
-    unit_items: List[Tuple[int, int, ItemFaixa]] = []
+    def __init__(self, max_tabelas: int):
+        self.max_tabelas = max_tabelas
+        self._tabelas: "OrderedDict[tuple, TabelaFaixas]" = OrderedDict()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._tabelas)
+
+    def obter(self, chave: tuple, W: int) -> Optional[TabelaFaixas]:
+        """Tabela já resolvida até uma largura >= W (mm), ou None."""
+        tabela = self._tabelas.get(chave)
+        if tabela is None or tabela.W < W:
+            return None
+        self._tabelas.move_to_end(chave)
+        return tabela
+
+    def guardar(self, chave: tuple, tabela: TabelaFaixas, max_bytes: Optional[int] = None) -> None:
+        antiga = self._tabelas.pop(chave, None)
+        if antiga is not None:
+            self.nbytes -= antiga.nbytes()
+        self._tabelas[chave] = tabela
+        self.nbytes += tabela.nbytes()
+        while self._tabelas and (len(self._tabelas) > self.max_tabelas
+                                 or (max_bytes is not None and self.nbytes > max_bytes)):
+            _, velha = self._tabelas.popitem(last=False)
+            self.nbytes -= velha.nbytes()
+
+
+def catalogar_itens(
+    itens: Iterable[ItemFaixa],
+    W: int,
+    valor_fn: Callable[[float, float, float | None], int],
+) -> Tuple[List[ItemFaixa], List[int], List[int], List[int]]:
+    """Filtra itens válidos e devolve (itens, pesos_mm, valores, qtds) com qtd limitada a W."""
+    validos: List[ItemFaixa] = []
+    pesos: List[int] = []
+    valores: List[int] = []
+    qtds: List[int] = []
     for t in itens:
         w_mm = int(round(t.passo_m * 1000.0))
-        if w_mm <= 0 or t.qtd_max <= 0:
+        if w_mm <= 0 or t.qtd_max <= 0 or w_mm > W:
             continue
-        v = valor_fn(t.passo_m, t.comp_por_faixa_m, t.sobra_linha_m)
-        for _ in range(t.qtd_max):
-            unit_items.append((w_mm, v, t))
+        validos.append(t)
+        pesos.append(w_mm)
+        valores.append(valor_fn(t.passo_m, t.comp_por_faixa_m, t.sobra_linha_m))
+        qtds.append(min(t.qtd_max, W // w_mm))
+    return validos, pesos, valores, qtds
+
+
+def bytes_contagens(W: int, qtds: Iterable[int]) -> int:
+    """Memória projetada da tabela de contagens completa (bytes)."""
+    return sum((W + 1) * array(_tipo_contagem(q)).itemsize for q in qtds)
 
-    if not unit_items:
-        return {}
 
-    # DP 1D (0/1)
+def montar_tabela(
+    itens: List[ItemFaixa],
+    largura_max_m: float,
+    valor_fn: Callable[[float, float, float | None], int],
+    backend: Optional[str] = None,
+    memoria_max_bytes: Optional[int] = None,
+) -> Optional[TabelaFaixas]:
+    """
+    Resolve a DP uma vez até largura_max_m. None se não há capacidade/itens.
+    backend=None escolhe automaticamente (ver core.backends_mochila).
+    memoria_max_bytes: se a tabela de contagens projetada passar disso,
+    resolve em blocos com reconstrução recalculada (menos memória, mais CPU).
+    """
+    W = int(round(largura_max_m * 1000.0))
+    if W <= 0 or not itens:
+        return None
+    validos, pesos, valores, qtds = catalogar_itens(itens, W, valor_fn)
+    if not validos:
+        return None
     dp = [-1] * (W + 1)
-    keep: List[Tuple[int, int] | None] = [None] * (W + 1)
     dp[0] = 0
+    # Em blocos: ~sqrt(n) pontos de dp (8 B/célula) + contagens de um bloco (~1 B/célula)
+    n = len(validos)
+    bloco = max(1, int(math.sqrt(8 * n)))
+    completa = bytes_contagens(W, qtds)
+    em_blocos = math.ceil(n / bloco) * 8 * (W + 1) + bytes_contagens(W, sorted(qtds)[-bloco:])
+    if memoria_max_bytes is None or completa <= memoria_max_bytes or em_blocos >= completa:
+        dp, contagens, backend = resolver_lote(dp, pesos, valores, qtds, backend=backend)
+        return TabelaFaixas(itens=validos, pesos=pesos, W=W, dp=dp, contagens=contagens, backend=backend)
+
+    pontos = []
+    for a in range(0, n, bloco):
+        try:
+            pontos.append(array('q', dp))
+        except OverflowError:
+            pontos.append(list(dp))
+        dp, _, backend = resolver_lote(dp, pesos[a:a + bloco], valores[a:a + bloco], qtds[a:a + bloco],
+                                       backend=backend)
+    return TabelaFaixas(itens=validos, pesos=pesos, W=W, dp=dp, contagens=None, backend=backend,
+                        valores=valores, qtds=qtds, pontos=pontos, bloco=bloco)
 
-    for k, (w_mm, v, t) in enumerate(unit_items):
-        for w in range(W, w_mm - 1, -1):
-            if dp[w - w_mm] != -1:
-                cand = dp[w - w_mm] + v
-                if cand > dp[w]:
-                    dp[w] = cand
-                    keep[w] = (w - w_mm, k)
-
-    # Melhor capacidade
-    w_best = max(range(W + 1), key=lambda w: dp[w])
-    if dp[w_best] <= 0 or keep[w_best] is None:
+
+def selecionar_faixas(
+    itens: List[ItemFaixa],
+    largura_m: float,
+    valor_fn: Callable[[float, float, float | None], int],
+) -> Dict[object, int]:
+    """
+    Resolve a mochila limitada (cada linha com até qtd_max faixas).
+    - Capacidade W = largura_m em mm
+    - Para cada faixa: peso = passo_mm, valor = valor_fn(...)
+    Retorna: {linha: faixas_escolhidas}
+    """
+    tabela = montar_tabela(itens, largura_m, valor_fn)
+    if tabela is None:
         return {}
+    return tabela.selecionar(largura_m)
 
-    # Reconstrução
-    usados_por_linha: Dict[object, int] = {}
-    w = w_best
-    while w > 0 and keep[w] is not None:
-        w_prev, k = keep[w]
-        _, _, t = unit_items[k]
-        usados_por_linha[t.linha] = usados_por_linha.get(t.linha, 0) + 1
-        w = w_prev
 
-    return usados_por_linha
+def selecionar_faixas_por_largura(
+    itens: List[ItemFaixa],
+    larguras_m: Iterable[float],
+    valor_fn: Callable[[float, float, float | None], int],
+) -> Dict[float, Dict[object, int]]:
+    """
+    Mesmo catálogo de itens, várias larguras de bobina: resolve UMA vez para
+    a maior largura e reconstrói a seleção de cada uma a partir da mesma tabela.
+    Retorna: {largura_m: {linha: faixas_escolhidas}}
+    """
+    larguras = list(larguras_m)
+    if not larguras:
+        return {}
+    tabela = montar_tabela(itens, max(larguras), valor_fn)
+    if tabela is None:
+        return {lm: {} for lm in larguras}
+    return {lm: tabela.selecionar(lm) for lm in larguras}
@@ -1,66 +1,123 @@
 # main.py
 import sys
-from services.leitor_excel import LeitorExcel
-from services import Relatorio
-from models import Bobina, Linha
+import argparse
+from contextlib import nullcontext
+from services.ingestao import ingerir_excel
+from services import Relatorio, criar_escritor
+from services.memoria import MedidorMemoria
 from core.alocador_bobinagem import AlocadorBobinagemReal  # novo
 
 CAMINHO_EXCEL_PADRAO = r"C:\Users\paulo.andrade\Desktop\dados.xlsx"
 
 def carregar_dados_excel(caminho: str):
-    bobinas_raw = LeitorExcel.ler_bobinas(caminho)
-    linhas_raw  = LeitorExcel.ler_linhas(caminho)
-
-    # Bobinas: ID, Diâmetro Externo (m), Diâmetro Interno (m), Comprimento (m) -> largura, Peso Máximo (kg)
-    bobinas = []
-    for b in bobinas_raw:
-        de = float(b['Diâmetro Externo (m)'])
-        di = float(b['Diâmetro Interno (m)'])
-        largura = float(b['Comprimento (m)'])  # usamos como largura da bobina
-        peso_max_ton = float(b['Peso Máximo (kg)']) / 1000.0  # kg -> ton
-        bobinas.append(Bobina(de, di, largura, peso_max_ton, 0.85))
-
-    # Linhas: ID, Diâmetro (m), Comprimento Necessário (m), Peso por Metro (kg/m), Raio Mínimo (m)
-    linhas = []
-    for l in linhas_raw:
-        codigo = str(l['ID']).strip()
-        diametro_mm = float(l['Diâmetro (m)']) * 1000.0
-        comp_m = float(l['Comprimento Necessário (m)'])
-        peso_um = float(l['Peso por Metro (kg/m)'])
-        raio_min = float(l['Raio Mínimo (m)'])
-        linhas.append(Linha(codigo, diametro_mm, comp_m, peso_um, raio_min))
-
-    return bobinas, linhas
-
-def main():
-    print("=== SISTEMA DE BOBINAGEM REAL (voltas por camada radial) ===")
+    """
+    Lê e normaliza as abas em lote (services.ingestao): aliases de coluna, conversão
+    de unidades (kg -> ton, m -> mm) e validação vetorizada.
+    Retorna (bobinas, linhas, rejeicoes) — rejeicoes é um DataFrame com as linhas descartadas.
+    """
+    resultado = ingerir_excel(caminho)
+    return resultado.bobinas, resultado.linhas, resultado.rejeicoes
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(description="Sistema de bobinagem real (voltas por camada radial)")
+    p.add_argument("caminho", nargs="?", default=CAMINHO_EXCEL_PADRAO, help="planilha de entrada")
+    p.add_argument("--formato", choices=["texto", "jsonl", "csv", "xlsx"], default="texto",
+                   help="formato do relatório (jsonl/csv/xlsx são gravados em streaming)")
+    p.add_argument("--saida", default=None, help="arquivo do relatório (padrão: stdout)")
+    p.add_argument("--somente-resumo", action="store_true",
+                   help="omite o detalhe por alocação (jsonl/csv/xlsx)")
+    p.add_argument("--lookahead", type=int, default=0,
+                   help="camadas avaliadas à frente antes de fixar cada camada (0 = guloso)")
+    p.add_argument("--orcamento-cpu", type=float, default=None,
+                   help="tempo de CPU máximo (s) da busca à frente por bobina")
+    p.add_argument("--orcamento-memoria", type=float, default=None, metavar="MB",
+                   help="teto de memória do planejamento: DP em blocos, cache limitado e relatório em streaming")
+    p.add_argument("--medir-memoria", action="store_true",
+                   help="informa o pico de memória alocada por fase (ingestão, planejamento, relatório) "
+                        "com tracemalloc — mais lento; com orçamento, sem esta opção, informa o pico de RSS")
+    p.add_argument("--rejeicoes", default=None, metavar="ARQUIVO",
+                   help="grava em CSV as linhas da planilha rejeitadas na validação")
+    return p.parse_args(argv)
+
+def main(argv=None):
+    args = _argumentos(argv)
+    caminho = args.caminho
+    streaming = args.formato != "texto"
+    # com saída em stdout, as mensagens de progresso não podem sujar o jsonl/csv
+    log = (lambda *a, **k: print(*a, file=sys.stderr, **k)) if streaming and args.saida is None else print
+
+    # tracemalloc só quando pedido: com orçamento, basta o pico de RSS (custo desprezível)
+    medidor = None
+    if args.medir_memoria:
+        medidor = MedidorMemoria()
+    elif args.orcamento_memoria is not None:
+        medidor = MedidorMemoria(rastrear=False)
+    fase = medidor.fase if medidor else (lambda nome: nullcontext())
+
+    log("=== SISTEMA DE BOBINAGEM REAL (voltas por camada radial) ===")
     try:
-        bobinas, linhas = carregar_dados_excel(CAMINHO_EXCEL_PADRAO)
+        with fase("ingestao"):
+            bobinas, linhas, rejeicoes = carregar_dados_excel(caminho)
+        if not rejeicoes.empty:
+            log(f"\n⚠️ {len(rejeicoes)} linha(s) da planilha rejeitada(s) na validação")
+            for _, r in rejeicoes.head(10).iterrows():
+                log(f"   - {r['Aba']} linha {r['Linha Planilha']} (ID '{r['ID']}'): {r['Motivos']}")
+            if len(rejeicoes) > 10:
+                log(f"   ... e mais {len(rejeicoes) - 10}")
+        if args.rejeicoes:
+            rejeicoes.to_csv(args.rejeicoes, index=False)
         if not bobinas or not linhas:
-            print(f"Nenhuma bobina ou linha encontrada em: {CAMINHO_EXCEL_PADRAO}")
+            log(f"Nenhuma bobina ou linha encontrada em: {caminho}")
             sys.exit(1)
 
-        print(f"\n✅ {len(bobinas)} bobina(s) carregada(s)")
-        print(f"✅ {len(linhas)} linha(s) carregada(s)")
+        log(f"\n✅ {len(bobinas)} bobina(s) carregada(s)")
+        log(f"✅ {len(linhas)} linha(s) carregada(s)")
+
+        alocador = AlocadorBobinagemReal(lookahead=args.lookahead, orcamento_cpu_s=args.orcamento_cpu,
+                                         orcamento_memoria_mb=args.orcamento_memoria)
+
+        def _planejar_uma_a_uma():
+            """Planeja bobina a bobina; a referência de cada uma é solta depois de relatada."""
+            for i in range(len(bobinas)):
+                bobina, bobinas[i] = bobinas[i], None
+                with fase("planejamento"):
+                    par = alocador.alocar_em_bobina(bobina, linhas)
+                yield par
+
+        if streaming:
+            # cada bobina é gravada assim que alocada e pode ser descartada
+            with fase("relatorio"), criar_escritor(args.formato, args.saida,
+                                                   somente_resumo=args.somente_resumo) as escritor:
+                for bobina, nao in _planejar_uma_a_uma():
+                    escritor.adicionar_bobina(bobina)
+                    escritor.adicionar_nao_alocadas(nao, bobina=escritor.bobinas_escritas)
+        elif args.orcamento_memoria is not None:
+            # com orçamento de memória, o relatório de texto também é gerado em streaming
+            with fase("relatorio"):
+                Relatorio().gerar_em_streaming(_planejar_uma_a_uma())
+        else:
+            bobinas_utilizadas = []
+            linhas_nao = []
 
-        alocador = AlocadorBobinagemReal()
-        bobinas_utilizadas = []
-        linhas_nao = []
+            with fase("planejamento"):
+                for bobina, nao in alocador.alocar_frota(bobinas, linhas):
+                    bobinas_utilizadas.append(bobina)
+                    linhas_nao.extend(nao)
 
-        for bobina in bobinas:
-            bobina, nao = alocador.alocar_em_bobina(bobina, linhas)
-            bobinas_utilizadas.append(bobina)
-            linhas_nao.extend(nao)
+            resultado = {
+                "bobinas_utilizadas": bobinas_utilizadas,
+                "linhas_nao_alocadas": linhas_nao
+            }
 
-        resultado = {
-            "bobinas_utilizadas": bobinas_utilizadas,
-            "linhas_nao_alocadas": linhas_nao
-        }
+            with fase("relatorio"):
+                Relatorio().gerar(resultado)
 
-        Relatorio().gerar(resultado)
+        if medidor:
+            log(f"\n{medidor.relatorio()}")
+            medidor.parar()
 
     except Exception as e:
-        print(f"\n⛔ ERRO ao processar '{CAMINHO_EXCEL_PADRAO}': {e}")
+        log(f"\n⛔ ERRO ao processar '{caminho}': {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
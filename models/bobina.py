@@ -2,8 +2,16 @@
 import math
 
 class Bobina:
-    """Representa uma bobina para armazenamento de linhas (bobinagem real)."""
-    
+    """
+    Representa uma bobina para armazenamento de linhas (bobinagem real).
+    Com __slots__; a capacidade efetiva de volume (volume_cap_m3) é calculada
+    uma vez no construtor. Se alterar dimensões ou o fator de um objeto
+    existente, chame recalcular().
+    """
+
+    __slots__ = ('diametro_externo', 'diametro_interno', 'largura', 'peso_maximo_ton', 'fator_empacotamento',
+                 'camadas', 'peso_atual_ton', 'volume_usado_m3', 'volume_cap_m3')
+
     def __init__(self, diametro_externo, diametro_interno, largura, peso_maximo_ton, fator_empacotamento=0.85):
         self.diametro_externo = diametro_externo
         self.diametro_interno = diametro_interno
@@ -13,6 +21,11 @@ class Bobina:
         self.camadas = []
         self.peso_atual_ton = 0.0
         self.volume_usado_m3 = 0.0
+        self.recalcular()
+
+    def recalcular(self):
+        """Refaz a capacidade efetiva de volume (m³), com fator."""
+        self.volume_cap_m3 = self.volume_total_m3 * self.fator_empacotamento
 
     def adicionar_camada(self, camada):
         """Adiciona a camada e acumula peso/volume PARCIAIS das alocações contidas nela."""
@@ -25,8 +38,7 @@ class Bobina:
             # peso parcial (ton)
             self.peso_atual_ton += (L.peso_por_metro_kg * comp) * 0.001
             # volume parcial (m³)
-            d_m = L.diametro / 1000.0
-            self.volume_usado_m3 += math.pi * (d_m/2.0)**2 * comp
+            self.volume_usado_m3 += L.area_m2 * comp
  
     @property
     def capacidade_disponivel(self):
@@ -37,8 +49,3 @@ class Bobina:
     def volume_total_m3(self):
         """Volume geométrico do anel da bobina (m³)."""
         return (math.pi/4.0) * (self.diametro_externo**2 - self.diametro_interno**2) * self.largura
-
-    @property
-    def volume_cap_m3(self):
-        """Capacidade efetiva de volume (m³), com fator."""
-        return self.volume_total_m3 * self.fator_empacotamento
@@ -1,13 +1,16 @@
 # models/camada.py
 class Camada:
     """Representa uma camada (radial) de bobinagem."""
-    
+
+    __slots__ = ('diametro_base', 'linhas', 'altura_camada', 'largura_ocupada', 'tipo', 'backend_mochila')
+
     def __init__(self, diametro_base, tipo='bobinagem'):
         self.diametro_base = diametro_base
         self.linhas = []
         self.altura_camada = 0
         self.largura_ocupada = 0
         self.tipo = tipo
+        self.backend_mochila = None   # backend do knapsack que resolveu a camada
     
     def adicionar_linha(self, linha, pos_x, pos_y, ordem=None,
                         comprimento_alocado=None, voltas_usadas=None,
@@ -1,29 +1,53 @@
 # models/linha.py
+import math
+
+
 class Linha:
-    """Representa uma linha/cabo a ser armazenado na bobina."""
-    
+    """
+    Representa uma linha/cabo a ser armazenado na bobina.
+    Com __slots__ (sem __dict__ por objeto). A área de seção (area_m2) é calculada
+    uma vez no construtor; os modelos são recriados, não alterados — se mudar
+    'diametro' num objeto existente, chame recalcular().
+    A flexibilidade (compat; não usada no modelo real) só é calculada se lida.
+    """
+
+    __slots__ = ('codigo', 'diametro', 'comprimento', 'peso_por_metro_kg', 'raio_minimo_m', 'area_m2')
+
     FLEXIBILIDADE_FATORES = {
         1: 1.0, 2: 0.9, 3: 0.75, 4: 0.6, 5: 0.45, 6: 0.3, 7: 0.15
     }
-    
+
     def __init__(self, codigo, diametro, comprimento, peso_por_metro_kg, raio_minimo_m):
         self.codigo = codigo              # ID único
         self.diametro = diametro          # em mm (DIÂMETRO REAL)
         self.comprimento = comprimento    # em m (comprimento total disponível)
         self.peso_por_metro_kg = peso_por_metro_kg
         self.raio_minimo_m = raio_minimo_m
-        self.flexibilidade = self._calcular_flexibilidade()
-    
+        self.recalcular()
+
+    def recalcular(self):
+        """Refaz os valores derivados do diâmetro."""
+        self.area_m2 = math.pi * (self.diametro_m / 2.0) ** 2  # seção transversal (m²)
+
+    @property
+    def diametro_m(self):
+        """Diâmetro real em metros."""
+        return self.diametro / 1000.0
+
+    @property
+    def flexibilidade(self):
+        return self._calcular_flexibilidade()
+
     @property
     def peso_ton(self):
         """Peso total da linha em toneladas (para referência)."""
         return (self.peso_por_metro_kg * self.comprimento) * 0.001
-    
+
     @property
     def diametro_efetivo(self):
         """Diâmetro 'efetivo' ajustado pela flexibilidade (compat; não usado no modelo real)."""
         return self.diametro * self.FLEXIBILIDADE_FATORES.get(self.flexibilidade, 1.0)
-    
+
     def _calcular_flexibilidade(self):
         """Estimativa de flexibilidade com base no raio mínimo."""
         razao = self.raio_minimo_m / (self.diametro / 1000)
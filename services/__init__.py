@@ -1,4 +1,5 @@
 # services/__init__.py
 from .relatorio import Relatorio
+from .escritores_relatorio import EscritorRelatorio, EscritorJSONL, EscritorCSV, criar_escritor
 
-__all__ = ['Relatorio']
+__all__ = ['Relatorio', 'EscritorRelatorio', 'EscritorJSONL', 'EscritorCSV', 'criar_escritor']
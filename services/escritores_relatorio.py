@@ -0,0 +1,273 @@
+# services/escritores_relatorio.py
+"""
+Escritores de relatório em streaming (JSON Lines / CSV).
+Cada bobina, camada e alocação vira UM registro, gravado assim que é
+produzido num arquivo com buffer: uma passada só, memória constante.
+"""
+
+from __future__ import annotations
+import csv
+import io
+import json
+import sys
+from typing import Dict, Iterator
+
+TAMANHO_BUFFER = 1 << 16  # 64 KiB
+
+CAMPOS = [
+    'tipo', 'bobina', 'camada', 'linha',
+    'diametro_externo_m', 'diametro_interno_m', 'largura_m',
+    'peso_maximo_ton', 'peso_usado_ton',
+    'volume_total_m3', 'volume_cap_m3', 'volume_usado_m3', 'ocupacao_volumetrica', 'qtd_camadas',
+    'diametro_base_m', 'largura_usada_m', 'pct_largura_usada', 'qtd_alocacoes', 'backend_mochila',
+    'diametro_mm', 'comprimento_m', 'comprimento_restante_m', 'voltas_usadas', 'voltas_capacidade',
+    'passo_m', 'lado', 'pos_y_m', 'pct_camada', 'peso_ton',
+    'peso_por_metro_kg', 'raio_minimo_m', 'bobinas_utilizadas', 'alocacoes', 'linhas_nao_alocadas',
+]
+
+
+def largura_registro(reg) -> float:
+    """Largura (m) ocupada por uma alocação dentro da camada."""
+    passo = reg.get('passo', None)
+    v_us = reg.get('voltas_usadas', None)
+    v_cap = reg.get('voltas_capacidade', None)
+    if passo is not None and v_us is not None and v_cap is not None:
+        return min(v_us, v_cap) * passo
+    # fallback improvável no modo real
+    d_eff = reg['objeto'].diametro_efetivo / 1000.0
+    return d_eff + 2.0 * (0.05 * d_eff)
+
+
+def registros_bobina(indice: int, bobina, detalhe: bool = True) -> Iterator[Dict]:
+    """
+    Gera os registros de uma bobina: primeiro a própria bobina, depois
+    cada camada e (se detalhe=True) cada alocação da camada.
+    A largura de cada alocação é calculada uma única vez.
+    """
+    v_linhas = getattr(bobina, "volume_usado_m3", 0.0)
+    v_cap = getattr(bobina, "volume_cap_m3", 0.0)
+    yield {
+        'tipo': 'bobina',
+        'bobina': indice,
+        'diametro_externo_m': bobina.diametro_externo,
+        'diametro_interno_m': bobina.diametro_interno,
+        'largura_m': bobina.largura,
+        'peso_maximo_ton': bobina.peso_maximo_ton,
+        'peso_usado_ton': bobina.peso_atual_ton,
+        'volume_total_m3': getattr(bobina, "volume_total_m3", 0.0),
+        'volume_cap_m3': v_cap,
+        'volume_usado_m3': v_linhas,
+        'ocupacao_volumetrica': min(1.0, max(0.0, (v_linhas / v_cap) if v_cap > 0 else 0.0)),
+        'qtd_camadas': len(bobina.camadas),
+    }
+
+    Ltot = max(1e-12, bobina.largura)
+    for j, camada in enumerate(bobina.camadas, 1):
+        larguras = [largura_registro(reg) for reg in camada.linhas]
+        largura_usada = sum(larguras)
+        yield {
+            'tipo': 'camada',
+            'bobina': indice,
+            'camada': j,
+            'diametro_base_m': camada.diametro_base,
+            'largura_m': bobina.largura,
+            'largura_usada_m': largura_usada,
+            'pct_largura_usada': min(100.0, largura_usada / Ltot * 100.0),
+            'qtd_alocacoes': len(larguras),
+            'backend_mochila': getattr(camada, 'backend_mochila', None),
+        }
+        if not detalhe:
+            continue
+        for reg, largura_item in zip(camada.linhas, larguras):
+            Lobj = reg['objeto']
+            comp = reg.get('comprimento_alocado', None)
+            if comp is None:
+                comp = Lobj.comprimento
+            yield {
+                'tipo': 'alocacao',
+                'bobina': indice,
+                'camada': j,
+                'linha': Lobj.codigo,
+                'diametro_mm': Lobj.diametro,
+                'comprimento_m': comp,
+                'voltas_usadas': reg.get('voltas_usadas'),
+                'voltas_capacidade': reg.get('voltas_capacidade'),
+                'passo_m': reg.get('passo'),
+                'lado': reg.get('lado'),
+                'pos_y_m': reg['posicao'][1],
+                'pct_camada': min(100.0, largura_item / Ltot * 100.0),
+                'peso_ton': (Lobj.peso_por_metro_kg * comp) * 0.001,
+            }
+
+
+def comprimentos_alocados(bobina) -> Dict[int, float]:
+    """Comprimento (m) alocado de cada linha na bobina, por id(linha)."""
+    alocado: Dict[int, float] = {}
+    for camada in bobina.camadas:
+        for reg in camada.linhas:
+            L = reg['objeto']
+            comp = reg.get('comprimento_alocado', None)
+            if comp is None:
+                comp = L.comprimento
+            alocado[id(L)] = alocado.get(id(L), 0.0) + comp
+    return alocado
+
+
+def registro_nao_alocada(linha, bobina: int | None = None, alocado_m: float | None = None) -> Dict:
+    """alocado_m: quanto da linha a bobina recebeu (None = desconhecido; comprimento_restante_m fica vazio)."""
+    return {
+        'tipo': 'nao_alocada',
+        'bobina': bobina,
+        'linha': linha.codigo,
+        'diametro_mm': linha.diametro,
+        'comprimento_m': linha.comprimento,
+        'comprimento_restante_m': max(0.0, linha.comprimento - alocado_m) if alocado_m is not None else None,
+        'peso_por_metro_kg': linha.peso_por_metro_kg,
+        'peso_ton': linha.peso_ton,
+        'raio_minimo_m': linha.raio_minimo_m,
+    }
+
+
+class EscritorRelatorio:
+    """
+    Base dos sinks de relatório em streaming.
+    Uso típico:
+        with EscritorJSONL('plano.jsonl') as esc:
+            esc.gerar(resultado)
+    ou, incrementalmente, esc.adicionar_bobina(bobina) logo após alocar cada uma.
+    somente_resumo=True omite os registros de alocação (mantém bobinas/camadas).
+    Se o bloco 'with' termina com exceção, o registro de resumo NÃO é gravado
+    (abortar()): a saída é só descarregada e fechada, e o consumidor percebe
+    que o plano está incompleto pela falta do resumo.
+    """
+
+    def __init__(self, destino=None, somente_resumo: bool = False):
+        self.somente_resumo = somente_resumo
+        self._proprio = False
+        self._saida = self._abrir(destino)
+        self._qtd_bobinas = 0
+        self._qtd_alocacoes = 0
+        self._qtd_nao_alocadas = 0
+        self._alocado_ultima: Dict[int, float] = {}
+
+    # ---------- API de streaming ----------
+    def adicionar_bobina(self, bobina):
+        self._qtd_bobinas += 1
+        # só da última bobina: basta para o remanescente das linhas que ela deixou
+        self._alocado_ultima = comprimentos_alocados(bobina)
+        for reg in registros_bobina(self._qtd_bobinas, bobina, detalhe=not self.somente_resumo):
+            if reg['tipo'] == 'camada':
+                self._qtd_alocacoes += reg['qtd_alocacoes']
+            self._escrever(reg)
+
+    @property
+    def bobinas_escritas(self) -> int:
+        return self._qtd_bobinas
+
+    def adicionar_nao_alocadas(self, linhas, bobina: int | None = None):
+        """
+        bobina: índice da bobina que deixou estas linhas com remanescente (opcional).
+        Se for a última bobina adicionada, o registro traz também o comprimento restante.
+        """
+        ultima = bobina is not None and bobina == self._qtd_bobinas
+        for L in linhas:
+            self._qtd_nao_alocadas += 1
+            alocado = self._alocado_ultima.get(id(L), 0.0) if ultima else None
+            self._escrever(registro_nao_alocada(L, bobina, alocado))
+
+    def gerar(self, resultado):
+        for bobina in resultado['bobinas_utilizadas']:
+            self.adicionar_bobina(bobina)
+        self.adicionar_nao_alocadas(resultado['linhas_nao_alocadas'])
+        self.fechar()
+
+    def fechar(self):
+        if self._saida is None:
+            return
+        self._escrever({
+            'tipo': 'resumo',
+            'bobinas_utilizadas': self._qtd_bobinas,
+            'alocacoes': self._qtd_alocacoes,
+            'linhas_nao_alocadas': self._qtd_nao_alocadas,
+        })
+        self._finalizar()
+        self._saida = None
+
+    def abortar(self):
+        """Encerra sem o registro de resumo (a geração falhou no meio)."""
+        if self._saida is None:
+            return
+        self._descartar()
+        self._saida = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        if tipo_exc is None:
+            self.fechar()
+        else:
+            self.abortar()
+        return False
+
+    # ---------- formato ----------
+    def _abrir(self, destino):
+        if destino is None:
+            return sys.stdout
+        if isinstance(destino, (str, bytes)) or hasattr(destino, '__fspath__'):
+            self._proprio = True
+            return io.open(destino, 'w', encoding='utf-8', newline='', buffering=TAMANHO_BUFFER)
+        return destino
+
+    def _finalizar(self):
+        if self._proprio:
+            self._saida.close()
+        else:
+            self._saida.flush()
+
+    def _descartar(self):
+        """Encerramento sem resumo: o que já foi gravado é descarregado e o arquivo fechado."""
+        self._finalizar()
+
+    def _escrever(self, registro: Dict):
+        raise NotImplementedError
+
+
+class EscritorJSONL(EscritorRelatorio):
+    """Um objeto JSON por linha (campos ausentes são omitidos)."""
+
+    def _escrever(self, registro: Dict):
+        self._saida.write(json.dumps(registro, ensure_ascii=False))
+        self._saida.write('\n')
+
+
+class EscritorCSV(EscritorRelatorio):
+    """CSV com colunas fixas (CAMPOS); campos não aplicáveis ficam vazios."""
+
+    def __init__(self, destino=None, somente_resumo: bool = False, delimitador: str = ','):
+        super().__init__(destino, somente_resumo)
+        self._csv = csv.DictWriter(self._saida, fieldnames=CAMPOS, delimiter=delimitador,
+                                   restval='', extrasaction='ignore')
+        self._csv.writeheader()
+
+    def _escrever(self, registro: Dict):
+        self._csv.writerow(registro)
+
+
+ESCRITORES = {
+    'jsonl': EscritorJSONL,
+    'csv': EscritorCSV,
+}
+
+
+def criar_escritor(formato: str, destino=None, somente_resumo: bool = False) -> EscritorRelatorio:
+    """Fábrica dos sinks por nome de formato ('jsonl' | 'csv' | 'xlsx')."""
+    if formato == 'xlsx':
+        # import tardio: openpyxl só é exigido para a exportação Excel
+        from .exportador_excel import EscritorExcel
+        return EscritorExcel(destino, somente_resumo=somente_resumo)
+    try:
+        cls = ESCRITORES[formato]
+    except KeyError:
+        raise ValueError(f"Formato de relatório desconhecido: {formato!r} (use {sorted(ESCRITORES) + ['xlsx']})")
+    return cls(destino, somente_resumo=somente_resumo)
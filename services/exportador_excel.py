@@ -0,0 +1,142 @@
+# services/exportador_excel.py
+"""
+Exportação do plano para Excel em modo write-only (memória constante).
+As abas Bobinas e Linhas seguem os nomes/colunas que o LeitorExcel lê,
+para que o resultado possa voltar ao planejamento:
+  - Bobinas     (mesmas colunas da aba de entrada)
+  - Camadas
+  - Alocacoes   (uma linha por linha/camada)
+  - Resumo      (uma linha por bobina)
+  - Linhas      (uma por ID de linha que nenhuma bobina recebeu por inteiro;
+                 "Comprimento Necessário (m)" é o menor remanescente entre as
+                 bobinas, "Bobina" a que o deixou e "Comprimento Total (m)" o
+                 total original)
+As linhas são anexadas conforme os registros chegam; o openpyxl em
+write_only grava cada aba em arquivo temporário e só monta o .xlsx no save().
+A aba Linhas é a exceção: só sai no fim, já que uma bobina posterior pode
+alocar a linha inteira (guarda-se uma entrada por ID, não por registro).
+"""
+
+from __future__ import annotations
+from typing import Dict, Optional
+
+from openpyxl import Workbook
+
+from .escritores_relatorio import EscritorRelatorio
+
+ABAS = {
+    'bobina': ('Bobinas', [
+        'ID', 'Diâmetro Externo (m)', 'Diâmetro Interno (m)', 'Largura (m)', 'Peso Máximo (kg)',
+    ]),
+    'camada': ('Camadas', [
+        'Bobina', 'Camada', 'Diâmetro Base (m)', 'Largura Usada (m)', '% Largura Usada', 'Alocações',
+        'Backend Knapsack',
+    ]),
+    'alocacao': ('Alocacoes', [
+        'Bobina', 'Camada', 'ID', 'Diâmetro (mm)', 'Comprimento Alocado (m)', 'Voltas Usadas',
+        'Voltas Capacidade', 'Passo (m)', 'Lado', 'Raio Médio (m)', '% da Camada', 'Peso (kg)',
+    ]),
+    'resumo': ('Resumo', [
+        'Bobina', 'Camadas', 'Alocações', 'Peso Usado (kg)', 'Peso Máximo (kg)', '% Peso',
+        'Volume Usado (m³)', 'Capacidade Volume (m³)', 'Ocupação Volumétrica (%)', '% Largura Média',
+    ]),
+    'nao_alocada': ('Linhas', [
+        'ID', 'Diâmetro (mm)', 'Comprimento Necessário (m)', 'Peso por Metro (kg/m)', 'Raio Mínimo (m)',
+        'Bobina', 'Comprimento Total (m)',
+    ]),
+}
+
+
+class EscritorExcel(EscritorRelatorio):
+    """Sink .xlsx write-only: suporta planos com 100k+ alocações sem guardá-las em memória."""
+
+    def _abrir(self, destino):
+        if destino is None or not (isinstance(destino, str) or hasattr(destino, '__fspath__')):
+            raise ValueError("A exportação Excel exige um caminho de arquivo (--saida)")
+        self._caminho = destino
+        self._wb = Workbook(write_only=True)
+        self._abas = {}
+        for tipo, (nome, cabecalho) in ABAS.items():
+            ws = self._wb.create_sheet(nome)
+            ws.append(cabecalho)
+            self._abas[tipo] = ws
+        self._bobina_aberta: Optional[Dict] = None
+        self._nao_alocadas: Dict[str, list] = {}   # ID -> [linha da aba com menor remanescente, nº de bobinas]
+        return self._wb
+
+    def _escrever(self, registro: Dict):
+        tipo = registro['tipo']
+        if tipo == 'bobina':
+            self._fechar_bobina()
+            self._bobina_aberta = dict(registro, alocacoes=0, pct_largura_soma=0.0)
+            self._abas['bobina'].append([
+                registro['bobina'], registro['diametro_externo_m'], registro['diametro_interno_m'],
+                registro['largura_m'], registro['peso_maximo_ton'] * 1000.0,
+            ])
+        elif tipo == 'camada':
+            if self._bobina_aberta is not None:
+                self._bobina_aberta['alocacoes'] += registro['qtd_alocacoes']
+                self._bobina_aberta['pct_largura_soma'] += registro['pct_largura_usada']
+            self._abas['camada'].append([
+                registro['bobina'], registro['camada'], registro['diametro_base_m'],
+                registro['largura_usada_m'], registro['pct_largura_usada'], registro['qtd_alocacoes'],
+                registro['backend_mochila'],
+            ])
+        elif tipo == 'alocacao':
+            self._abas['alocacao'].append([
+                registro['bobina'], registro['camada'], registro['linha'], registro['diametro_mm'],
+                registro['comprimento_m'], registro['voltas_usadas'], registro['voltas_capacidade'],
+                registro['passo_m'], registro['lado'], registro['pos_y_m'], registro['pct_camada'],
+                registro['peso_ton'] * 1000.0,
+            ])
+        elif tipo == 'nao_alocada':
+            restante = registro['comprimento_restante_m']
+            linha = [
+                registro['linha'], registro['diametro_mm'],
+                restante if restante is not None else registro['comprimento_m'],
+                registro['peso_por_metro_kg'], registro['raio_minimo_m'], registro['bobina'],
+                registro['comprimento_m'],
+            ]
+            visto = self._nao_alocadas.get(registro['linha'])
+            if visto is None:
+                self._nao_alocadas[registro['linha']] = [linha, 1]
+            else:
+                visto[1] += 1
+                if linha[2] < visto[0][2]:
+                    visto[0] = linha
+        elif tipo == 'resumo':
+            self._fechar_bobina()
+            self._gravar_linhas(registro['bobinas_utilizadas'])
+
+    def _fechar_bobina(self):
+        """Grava a linha da aba Resumo da bobina corrente (acumulada em streaming)."""
+        b = self._bobina_aberta
+        if b is None:
+            return
+        self._bobina_aberta = None
+        peso_max_kg = b['peso_maximo_ton'] * 1000.0
+        peso_kg = b['peso_usado_ton'] * 1000.0
+        n_cam = b['qtd_camadas']
+        self._abas['resumo'].append([
+            b['bobina'], n_cam, b['alocacoes'], peso_kg, peso_max_kg,
+            (peso_kg / peso_max_kg * 100.0) if peso_max_kg > 0 else 0.0,
+            b['volume_usado_m3'], b['volume_cap_m3'], b['ocupacao_volumetrica'] * 100.0,
+            (b['pct_largura_soma'] / n_cam) if n_cam else 0.0,
+        ])
+
+    def _gravar_linhas(self, n_bobinas: int):
+        """Aba Linhas: só as linhas que todas as bobinas deixaram com remanescente."""
+        ws = self._abas['nao_alocada']
+        for linha, n in self._nao_alocadas.values():
+            if n >= n_bobinas:
+                ws.append(linha)
+        self._nao_alocadas = {}
+
+    def _finalizar(self):
+        self._wb.save(self._caminho)
+
+    def _descartar(self):
+        # sem save(): nenhum .xlsx parcial (que pareceria completo) é criado;
+        # só fecha os arquivos temporários das abas
+        for ws in self._abas.values():
+            ws.close()
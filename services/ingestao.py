@@ -0,0 +1,184 @@
+# services/ingestao.py
+"""
+Ingestão em lote das abas 'Bobinas' e 'Linhas'.
+
+Em vez de converter linha a linha (float()/str() por campo), cada aba passa
+por um único estágio vetorizado sobre colunas inteiras:
+  1) aliases: escolhe a primeira coluna presente entre as alternativas;
+  2) tipos: pd.to_numeric(errors='coerce') — texto inválido vira NaN;
+  3) unidades: kg -> ton (bobinas), m -> mm (diâmetro das linhas);
+  4) validação: máscaras booleanas por regra; linhas reprovadas saem para o
+     relatório de rejeições (aba, linha da planilha, ID, motivos) em vez de
+     derrubar a execução ou chegarem ao alocador com valores absurdos;
+  5) construção dos modelos de uma vez, a partir das colunas já limpas.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models import Bobina, Linha
+from services.leitor_excel import LeitorExcel
+
+FATOR_EMPACOTAMENTO_PADRAO = 0.85
+COLUNAS_REJEICOES = ['Aba', 'Linha Planilha', 'ID', 'Motivos']
+
+# campo normalizado -> colunas aceitas (após o renomeio do LeitorExcel), na ordem de preferência.
+# O ID da bobina é opcional (o modelo Bobina não o guarda): sem a coluna, vale a linha da planilha.
+ALIASES_BOBINAS = {
+    'id': ['ID'],
+    'de_m': ['Diâmetro Externo (m)'],
+    'di_m': ['Diâmetro Interno (m)'],
+    'largura_m': ['Largura (m)', 'Largura', 'Comprimento (m)'],
+    'peso_max_kg': ['Peso Máximo (kg)'],
+}
+
+ALIASES_LINHAS = {
+    'id': ['ID'],
+    'diametro_m': ['Diâmetro (m)'],
+    'comprimento_m': ['Comprimento Necessário (m)'],
+    'peso_por_metro_kg': ['Peso por Metro (kg/m)'],
+    'raio_minimo_m': ['Raio Mínimo (m)'],
+}
+
+
+@dataclass
+class ResultadoIngestao:
+    bobinas: List[Bobina] = field(default_factory=list)
+    linhas: List[Linha] = field(default_factory=list)
+    rejeicoes: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=COLUNAS_REJEICOES))
+
+    def resumo_rejeicoes(self) -> str:
+        """Contagem de linhas rejeitadas por aba (texto curto para log)."""
+        if self.rejeicoes.empty:
+            return "nenhuma linha rejeitada"
+        contagem = self.rejeicoes.groupby('Aba', sort=False).size()
+        return ", ".join(f"{aba}: {n}" for aba, n in contagem.items())
+
+
+def _linha_planilha(n: int) -> np.ndarray:
+    """Número da linha na planilha de cada registro (linha 1 é o cabeçalho)."""
+    return np.arange(n) + 2
+
+
+def _coluna(df: pd.DataFrame, alternativas: Sequence[str], aba: str, obrigatoria: bool = True) -> Optional[pd.Series]:
+    for nome in alternativas:
+        if nome in df.columns:
+            return df[nome]
+    if not obrigatoria:
+        return None
+    raise Exception(f"Coluna obrigatória ausente na aba '{aba}': {' / '.join(alternativas)}")
+
+
+def _normalizar(df: pd.DataFrame, aliases: Dict[str, List[str]], aba: str, opcionais: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Aliases + coerção de tipo: ID como texto, demais campos numéricos (NaN se inválidos).
+    Um ID opcional ausente vira o número da linha na planilha.
+    """
+    colunas = {}
+    for campo, alternativas in aliases.items():
+        s = _coluna(df, alternativas, aba, obrigatoria=campo not in opcionais)
+        if s is None:
+            colunas[campo] = pd.Series(_linha_planilha(len(df)).astype(str), index=df.index, dtype='string')
+        elif campo == 'id':
+            colunas[campo] = s.astype('string').str.strip().fillna('')
+        else:
+            colunas[campo] = pd.to_numeric(s, errors='coerce').astype('float64')
+    return pd.DataFrame(colunas, index=df.index)
+
+
+def _aplicar_regras(norm: pd.DataFrame, regras: List[Tuple[str, pd.Series]], aba: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Separa linhas válidas e rejeitadas; cada rejeição lista todos os motivos violados."""
+    motivos = pd.Series('', index=norm.index, dtype='object')
+    for motivo, mascara in regras:
+        mascara = mascara.fillna(False).astype(bool)
+        motivos = motivos.where(~mascara, motivos + '; ' + motivo)
+    motivos = motivos.str.removeprefix('; ')
+    invalida = motivos != ''
+
+    posicao = _linha_planilha(len(norm))
+    rejeicoes = pd.DataFrame({
+        'Aba': aba,
+        'Linha Planilha': posicao[invalida.to_numpy()],
+        'ID': norm['id'][invalida].to_numpy(),
+        'Motivos': motivos[invalida].to_numpy(),
+    }, columns=COLUNAS_REJEICOES)
+    return norm[~invalida], rejeicoes
+
+
+def normalizar_bobinas(df: pd.DataFrame, fator_empacotamento: float = FATOR_EMPACOTAMENTO_PADRAO) -> Tuple[List[Bobina], pd.DataFrame]:
+    """DataFrame da aba 'Bobinas' -> (bobinas válidas, rejeições)."""
+    norm = _normalizar(df, ALIASES_BOBINAS, 'Bobinas', opcionais=('id',))
+    de, di, larg, peso = norm['de_m'], norm['di_m'], norm['largura_m'], norm['peso_max_kg']
+    regras = [
+        ('Diâmetro externo ausente/inválido', de.isna()),
+        ('Diâmetro interno ausente/inválido', di.isna()),
+        ('Largura ausente/inválida', larg.isna()),
+        ('Peso máximo ausente/inválido', peso.isna()),
+        ('Diâmetro interno negativo', di < 0),
+        ('Diâmetro externo <= interno', de <= di),
+        ('Largura <= 0', larg <= 0),
+        ('Peso máximo <= 0', peso <= 0),
+    ]
+    validas, rejeicoes = _aplicar_regras(norm, regras, 'Bobinas')
+
+    peso_ton = validas['peso_max_kg'] / 1000.0   # kg -> ton
+    bobinas = [
+        Bobina(de_m, di_m, larg_m, p_ton, fator_empacotamento)
+        for de_m, di_m, larg_m, p_ton in zip(
+            validas['de_m'].tolist(), validas['di_m'].tolist(),
+            validas['largura_m'].tolist(), peso_ton.tolist(),
+        )
+    ]
+    return bobinas, rejeicoes
+
+
+def normalizar_linhas(df: pd.DataFrame) -> Tuple[List[Linha], pd.DataFrame]:
+    """DataFrame da aba 'Linhas' (diâmetro em m, como devolve o LeitorExcel) -> (linhas válidas, rejeições)."""
+    norm = _normalizar(df, ALIASES_LINHAS, 'Linhas')
+    d, comp, kgpm, rmin = norm['diametro_m'], norm['comprimento_m'], norm['peso_por_metro_kg'], norm['raio_minimo_m']
+    regras = [
+        ('ID vazio', norm['id'] == ''),
+        ('Diâmetro ausente/inválido', d.isna()),
+        ('Comprimento ausente/inválido', comp.isna()),
+        ('Peso por metro ausente/inválido', kgpm.isna()),
+        ('Raio mínimo ausente/inválido', rmin.isna()),
+        ('Diâmetro <= 0', d <= 0),
+        ('Comprimento <= 0', comp <= 0),
+        ('Peso por metro negativo', kgpm < 0),
+        ('Raio mínimo negativo', rmin < 0),
+    ]
+    validas, rejeicoes = _aplicar_regras(norm, regras, 'Linhas')
+
+    diametro_mm = validas['diametro_m'] * 1000.0   # m -> mm (unidade do modelo Linha)
+    linhas = [
+        Linha(codigo, d_mm, c_m, kg_m, r_m)
+        for codigo, d_mm, c_m, kg_m, r_m in zip(
+            validas['id'].tolist(), diametro_mm.tolist(), validas['comprimento_m'].tolist(),
+            validas['peso_por_metro_kg'].tolist(), validas['raio_minimo_m'].tolist(),
+        )
+    ]
+    return linhas, rejeicoes
+
+
+def ingerir(df_bobinas: pd.DataFrame, df_linhas: pd.DataFrame,
+            fator_empacotamento: float = FATOR_EMPACOTAMENTO_PADRAO) -> ResultadoIngestao:
+    """Normaliza e valida as duas abas; as rejeições das duas ficam num único DataFrame."""
+    bobinas, rej_b = normalizar_bobinas(df_bobinas, fator_empacotamento)
+    linhas, rej_l = normalizar_linhas(df_linhas)
+    partes = [r for r in (rej_b, rej_l) if not r.empty]
+    rejeicoes = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUNAS_REJEICOES)
+    return ResultadoIngestao(bobinas=bobinas, linhas=linhas, rejeicoes=rejeicoes)
+
+
+def ingerir_excel(caminho: str, fator_empacotamento: float = FATOR_EMPACOTAMENTO_PADRAO) -> ResultadoIngestao:
+    """Lê a planilha com o LeitorExcel e aplica ingerir()."""
+    return ingerir(LeitorExcel.ler_bobinas_df(caminho), LeitorExcel.ler_linhas_df(caminho), fator_empacotamento)
+
+
+__all__ = [
+    "ResultadoIngestao", "ingerir", "ingerir_excel", "normalizar_bobinas", "normalizar_linhas",
+]
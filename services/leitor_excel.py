@@ -1,95 +1,171 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 class LeitorExcel:
     """Classe para leitura e processamento de dados de bobinas e linhas a partir de arquivos Excel."""
 
+    MAPEAMENTO_BOBINAS = {
+        'ID': ['ID', 'Código'],
+        'Diâmetro Externo (m)': ['Diâmetro Externo (m)', 'DE'],
+        'Diâmetro Interno (m)': ['Diâmetro Interno (m)', 'DI'],
+        'Largura (m)': ['Largura (m)', 'Largura'],
+        'Peso Máximo (kg)': ['Peso Máximo (kg)', 'Peso Max']
+    }
+
+    MAPEAMENTO_LINHAS = {
+        'ID': ['ID', 'Código'],
+        'Diâmetro (mm)': ['Diâmetro (mm)', 'Diametro'],
+        'Comprimento Necessário (m)': ['Comprimento Necessário (m)', 'Comp Necessario'],
+        'Peso por Metro (kg/m)': ['Peso por Metro (kg/m)', 'Peso Unitario'],
+        'Raio Mínimo (m)': ['Raio Mínimo (m)', 'Raio Min']
+    }
+
     @staticmethod
-    def ler_bobinas(caminho_arquivo):
-        """Lê dados de bobinas com tratamento robusto para colunas."""
+    def _renomear(df, mapeamento):
+        colunas_renomear = {}
+        for padrao, alternativas in mapeamento.items():
+            for alternativa in alternativas:
+                if alternativa in df.columns:
+                    colunas_renomear[alternativa] = padrao
+                    break
+        return df.rename(columns=colunas_renomear)
+
+    @staticmethod
+    def ler_bobinas_df(caminho_arquivo):
+        """Lê a aba 'Bobinas' como DataFrame, com colunas renomeadas para o padrão."""
         try:
             df = pd.read_excel(caminho_arquivo, sheet_name='Bobinas')
-            
-            mapeamento = {
-                'ID': ['ID', 'Código'],
-                'Diâmetro Externo (m)': ['Diâmetro Externo (m)', 'DE'],
-                'Diâmetro Interno (m)': ['Diâmetro Interno (m)', 'DI'],
-                'Largura (m)': ['Largura (m)', 'Largura'],
-                'Peso Máximo (kg)': ['Peso Máximo (kg)', 'Peso Max']
-            }
-            
-            colunas_renomear = {}
-            for padrao, alternativas in mapeamento.items():
-                for alternativa in alternativas:
-                    if alternativa in df.columns:
-                        colunas_renomear[alternativa] = padrao
-                        break
-            
-            df = df.rename(columns=colunas_renomear)
-            return df.to_dict('records')
-            
+            return LeitorExcel._renomear(df, LeitorExcel.MAPEAMENTO_BOBINAS)
         except Exception as e:
             raise Exception(f"Erro ao ler bobinas: {str(e)}")
 
     @staticmethod
-    def ler_linhas(caminho_arquivo):
-        """Lê dados de linhas com tratamento flexível para colunas."""
+    def ler_linhas_df(caminho_arquivo):
+        """Lê a aba 'Linhas' como DataFrame, com colunas renomeadas e diâmetro em metros."""
         try:
             df = pd.read_excel(caminho_arquivo, sheet_name='Linhas')
-            
-            mapeamento = {
-                'ID': ['ID', 'Código'],
-                'Diâmetro (mm)': ['Diâmetro (mm)', 'Diametro'],
-                'Comprimento Necessário (m)': ['Comprimento Necessário (m)', 'Comp Necessario'],
-                'Peso por Metro (kg/m)': ['Peso por Metro (kg/m)', 'Peso Unitario'],
-                'Raio Mínimo (m)': ['Raio Mínimo (m)', 'Raio Min']
-            }
-            
-            colunas_renomear = {}
-            for padrao, alternativas in mapeamento.items():
-                for alternativa in alternativas:
-                    if alternativa in df.columns:
-                        colunas_renomear[alternativa] = padrao
-                        break
-            
-            df = df.rename(columns=colunas_renomear)
-            
+            df = LeitorExcel._renomear(df, LeitorExcel.MAPEAMENTO_LINHAS)
+
             # Conversão de mm para m
             if 'Diâmetro (mm)' in df.columns:
                 df['Diâmetro (m)'] = df['Diâmetro (mm)'] / 1000
                 df = df.drop(columns=['Diâmetro (mm)'])
-            
-            return df.to_dict('records')
-            
+
+            return df
         except Exception as e:
             raise Exception(f"Erro ao ler linhas: {str(e)}")
 
     @staticmethod
-    def calcular_camadas(bobina, linhas_alocadas):
-        """Calcula a disposição física das linhas na bobina com validação de espaço."""
+    def ler_bobinas(caminho_arquivo):
+        """Lê dados de bobinas com tratamento robusto para colunas."""
+        return LeitorExcel.ler_bobinas_df(caminho_arquivo).to_dict('records')
+
+    @staticmethod
+    def ler_linhas(caminho_arquivo):
+        """Lê dados de linhas com tratamento flexível para colunas."""
+        return LeitorExcel.ler_linhas_df(caminho_arquivo).to_dict('records')
+
+    @staticmethod
+    def estimar_frota(bobinas, linhas):
+        """
+        Dimensionamento rápido (estimativa) de todas as combinações bobina × linha.
+        Empilha uma linha por camada, da mais grossa para a mais fina, usando somas
+        cumulativas vetorizadas de diâmetro, peso e comprimento por bobina.
+        'bobinas'/'linhas': registros como os de ler_bobinas/ler_linhas, ou DataFrames.
+        Estimativa conservadora: a partir da primeira linha que não cabe, as
+        seguintes também ficam de fora (não há reaproveitamento da folga) — ao
+        contrário de calcular_camadas, que pula a linha que não cabe e segue
+        empilhando as mais finas. Enquanto todas cabem, as duas coincidem.
+        Retorna um DataFrame com uma linha por (bobina, linha); 'Índice Bobina'
+        (posição, base 1) identifica a bobina mesmo com IDs repetidos.
+        """
+        df_b = pd.DataFrame(bobinas).reset_index(drop=True)
+        df_l = pd.DataFrame(linhas).reset_index(drop=True)
+        colunas = ['Índice Bobina', 'Bobina', 'Camada', 'Linha ID', 'Diâmetro', 'Raio Interno', 'Raio Externo',
+                   'Comprimento', 'Peso por Metro (kg/m)', 'Diâmetro Interno (m)', 'Diâmetro Final (m)',
+                   'Peso Acumulado (kg)', 'Comprimento Acumulado (m)',
+                   'Cabe Diâmetro', 'Cabe Peso', 'Cabe']
+        if df_b.empty or df_l.empty:
+            return pd.DataFrame(columns=colunas)
+
+        df_b['Índice Bobina'] = np.arange(1, len(df_b) + 1)
+        df_b['Bobina'] = df_b['ID'] if 'ID' in df_b.columns else df_b['Índice Bobina']
+        if 'Peso Máximo (kg)' not in df_b.columns:
+            df_b['Peso Máximo (kg)'] = np.inf
+        df_b = df_b[['Índice Bobina', 'Bobina', 'Diâmetro Interno (m)', 'Diâmetro Externo (m)', 'Peso Máximo (kg)']]
+
+        df_l = df_l.rename(columns={'ID': 'Linha ID', 'Diâmetro (m)': 'Diâmetro',
+                                    'Comprimento Necessário (m)': 'Comprimento'})
+        df_l = df_l[['Linha ID', 'Diâmetro', 'Comprimento', 'Peso por Metro (kg/m)']]
+        df_l = df_l.sort_values('Diâmetro', ascending=False, kind='stable')
+
+        df = df_b.merge(df_l, how='cross')  # ordem: bobina, depois diâmetro decrescente
+        df['Peso'] = df['Comprimento'] * df['Peso por Metro (kg/m)']
+        acum = df.groupby('Índice Bobina', sort=False)[['Diâmetro', 'Peso', 'Comprimento']].cumsum()
+        n_l = len(df_l)
+
+        df['Camada'] = np.tile(np.arange(1, n_l + 1), len(df_b))
+        df['Raio Externo'] = df['Diâmetro Interno (m)'] / 2.0 + acum['Diâmetro']
+        df['Raio Interno'] = df['Raio Externo'] - df['Diâmetro']
+        df['Diâmetro Final (m)'] = 2.0 * df['Raio Externo']
+        df['Peso Acumulado (kg)'] = acum['Peso']
+        df['Comprimento Acumulado (m)'] = acum['Comprimento']
+        df['Cabe Diâmetro'] = df['Diâmetro Final (m)'] <= df['Diâmetro Externo (m)']
+        df['Cabe Peso'] = df['Peso Acumulado (kg)'] <= df['Peso Máximo (kg)']
+        df['Cabe'] = df['Cabe Diâmetro'] & df['Cabe Peso']
+        return df[colunas].reset_index(drop=True)
+
+    @staticmethod
+    def resumo_frota(estimativa):
+        """
+        Métricas por bobina (índice: 'Índice Bobina') a partir de estimar_frota, só com as
+        linhas que cabem. Bobina sem nenhuma linha: zeros e diâmetro final = DI,
+        como em calcular_resumo.
+        """
+        bobinas = estimativa.groupby('Índice Bobina', sort=False).agg(
+            Bobina=('Bobina', 'first'), di=('Diâmetro Interno (m)', 'first'))
+        g = estimativa[estimativa['Cabe']].groupby('Índice Bobina', sort=False)
+        resumo = pd.DataFrame({
+            'Bobina': bobinas['Bobina'],
+            'linhas_que_cabem': g.size().reindex(bobinas.index, fill_value=0),
+            'peso_total': g['Peso Acumulado (kg)'].max().reindex(bobinas.index, fill_value=0.0),
+            'comprimento_total': g['Comprimento Acumulado (m)'].max().reindex(bobinas.index, fill_value=0.0),
+            'diametro_final': g['Diâmetro Final (m)'].max().reindex(bobinas.index).fillna(bobinas['di']),
+        })
+        return resumo
+
+    @staticmethod
+    def calcular_camadas_com_rejeicoes(bobina, linhas_alocadas):
+        """
+        Como calcular_camadas, devolvendo também as linhas que não cabem:
+        (camadas, rejeitadas), com rejeitadas = [{'Camada', 'Linha ID', 'Diâmetro Final (m)'}, ...]
+        ('Diâmetro Final (m)' é o diâmetro que a bobina teria com a linha).
+        """
         linhas_ordenadas = sorted(
-            linhas_alocadas, 
-            key=lambda x: x['Diâmetro (m)'], 
+            linhas_alocadas,
+            key=lambda x: x['Diâmetro (m)'],
             reverse=True
         )
-        
+
         camadas = []
+        rejeitadas = []
         altura_acumulada = 0
         diametro_interno = bobina['Diâmetro Interno (m)']
         diametro_externo = bobina['Diâmetro Externo (m)']
-        
+
         for i, linha in enumerate(linhas_ordenadas, 1):
             diam_linha = linha['Diâmetro (m)']
-            
+
             # Verificação de espaço disponível
             diametro_final = diametro_interno + 2 * (altura_acumulada + diam_linha)
             if diametro_final > diametro_externo:
-                print(f"⚠️ Linha {linha['ID']} não cabe - Diâmetro final seria {diametro_final:.3f}m (limite: {diametro_externo}m)")
+                rejeitadas.append({'Camada': i, 'Linha ID': linha['ID'], 'Diâmetro Final (m)': diametro_final})
                 continue
-                
+
             raio_interno = diametro_interno/2 + altura_acumulada
             raio_externo = raio_interno + diam_linha
-            
+
             camada = {
                 'Camada': i,
                 'Linha ID': linha['ID'],
@@ -99,11 +175,20 @@ class LeitorExcel:
                 'Comprimento': linha['Comprimento Necessário (m)'],
                 'Peso por Metro (kg/m)': linha['Peso por Metro (kg/m)']
             }
-            
+
             camadas.append(camada)
             altura_acumulada += diam_linha
-        
-        return camadas
+
+        return camadas, rejeitadas
+
+    @staticmethod
+    def calcular_camadas(bobina, linhas_alocadas):
+        """
+        Calcula a disposição física das linhas na bobina com validação de espaço.
+        Linha que não cabe é pulada (as mais finas seguem sendo empilhadas); para
+        saber quais ficaram de fora, use calcular_camadas_com_rejeicoes.
+        """
+        return LeitorExcel.calcular_camadas_com_rejeicoes(bobina, linhas_alocadas)[0]
 
     @staticmethod
     def calcular_resumo(bobina, camadas):
@@ -114,17 +199,17 @@ class LeitorExcel:
                 'diametro_final': bobina['Diâmetro Interno (m)'],
                 'espaco_utilizado': 0
             }
-        
+
         peso_total = sum(
             camada['Comprimento'] * camada['Peso por Metro (kg/m)']
             for camada in camadas
         )
-        
+
         diametro_final = camadas[-1]['Raio Externo'] * 2
         espaco_utilizado = diametro_final / bobina['Diâmetro Externo (m)']
-        
+
         return {
             'peso_total': peso_total,
             'diametro_final': diametro_final,
             'espaco_utilizado': espaco_utilizado
-        }
\ No newline at end of file
+        }
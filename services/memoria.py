@@ -0,0 +1,85 @@
+# services/memoria.py
+"""
+Medição de pico de memória por fase (ingestão, planejamento, relatório).
+As fases podem se alternar (modo streaming: planeja uma bobina, grava, planeja a
+próxima...) e até se aninhar: o pico é atribuído à fase mais interna ativa.
+
+Dois modos:
+  - tracemalloc (--medir-memoria): pico da memória alocada pelo Python, por fase.
+    Preciso, mas o rastreamento deixa o programa bem mais lento e maior;
+  - RSS (padrão do orçamento de memória): pico de RSS do processo via
+    resource.getrusage, lido ao fim de cada trecho. Custo desprezível, mas o
+    pico de RSS só cresce: cada fase mostra o maior valor atingido até ela.
+    Sem o módulo resource (Windows), nada é medido.
+"""
+
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_pico_bytes():
+    """Pico de RSS do processo até agora (bytes), ou None se indisponível."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024  # Linux informa KiB
+
+
+class MedidorMemoria:
+    """Acumula, por fase, o maior pico de memória (bytes) — tracemalloc ou RSS (ver docstring do módulo)."""
+
+    def __init__(self, rastrear=True):
+        self.rastrear = rastrear
+        self.picos = {}
+        self._pilha = []
+        self._iniciou = False
+
+    def iniciar(self):
+        if self.rastrear and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou = True
+        return self
+
+    def parar(self):
+        if self._iniciou:
+            tracemalloc.stop()
+            self._iniciou = False
+
+    def _fechar_trecho(self):
+        """Credita o pico desde o último reset à fase do topo da pilha."""
+        if not self.rastrear:
+            pico = _rss_pico_bytes()
+            if self._pilha and pico is not None:
+                nome = self._pilha[-1]
+                self.picos[nome] = max(self.picos.get(nome, 0), pico)
+            return
+        if self._pilha and tracemalloc.is_tracing():
+            nome = self._pilha[-1]
+            pico = tracemalloc.get_traced_memory()[1]
+            self.picos[nome] = max(self.picos.get(nome, 0), pico)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def fase(self, nome):
+        self.iniciar()
+        self._fechar_trecho()
+        self._pilha.append(nome)
+        try:
+            yield self
+        finally:
+            self._fechar_trecho()
+            self._pilha.pop()
+
+    def relatorio(self):
+        """Linha de texto com o pico por fase, em MiB."""
+        if not self.picos:
+            return "Pico de memória por fase indisponível nesta plataforma (use --medir-memoria)"
+        partes = [f"{nome}: {pico / (1 << 20):.1f} MiB" for nome, pico in self.picos.items()]
+        titulo = "Pico de memória por fase" if self.rastrear else "Pico de RSS do processo até o fim de cada fase"
+        return titulo + " — " + " | ".join(partes)
@@ -0,0 +1,333 @@
+# services/servidor.py
+"""
+Serviço local de planejamento (asyncio), de vida longa.
+
+Evita pagar a cada pedido a partida do processo, os imports e caches frios:
+os processos do pool importam o núcleo uma vez e mantêm um
+AlocadorBobinagemReal "quente" por trabalhador. As linhas recebidas são
+reaproveitadas por conteúdo entre pedidos (mesmo objeto Linha para a mesma
+entrada), de modo que o cache de tabelas de knapsack do alocador — indexado
+pelo objeto — acerta entre bobinas e entre pedidos. Entradas repetidas num
+mesmo pedido continuam sendo linhas distintas (cada uma com seu objeto). As bobinas de um pedido vão em lotes
+(um por trabalhador): as linhas são enviadas uma vez por lote e, dentro do
+lote, as bobinas mais estreitas reusam as tabelas das mais largas.
+
+Protocolo: JSON por linha (NDJSON) sobre socket Unix ou TCP em localhost.
+Pedidos:
+  {"tipo": "saude"}
+  {"tipo": "metricas"}
+  {"tipo": "planejar", "id": "...", "timeout_s": 5.0, "somente_resumo": false,
+   "bobinas": [{"diametro_externo": 4.5, "diametro_interno": 2.4, "largura": 3.0,
+                "peso_maximo_ton": 250.0, "fator_empacotamento": 0.85}, ...],
+   "linhas":  [{"codigo": "L1", "diametro": 150.5, "comprimento": 800.0,
+                "peso_por_metro_kg": 45.0, "raio_minimo_m": 1.2}, ...]}
+Respostas de "planejar" chegam em streaming por lote: os registros das
+bobinas de um lote (mesmo formato de EscritorJSONL, com "id") assim que o
+lote inteiro termina — com no máximo uma bobina por trabalhador, um lote é
+uma bobina — e por fim {"tipo": "fim"} ou {"tipo": "erro"}. O "timeout_s"
+vale também dentro dos trabalhadores: o alocador confere o prazo entre
+camadas e abandona o pedido, sem segurar o processo para os seguintes. Pedido malformado (não é um
+objeto JSON, campos com tipo errado) recebe {"tipo": "erro"}, sem derrubar a conexão.
+
+Uso: python -m services.servidor --porta 8765   |   --unix /tmp/bobinagem.sock
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from models import Bobina, Linha
+from .escritores_relatorio import comprimentos_alocados, registros_bobina, registro_nao_alocada
+
+LIMITE_LINHA = 64 * 1024 * 1024  # pedidos grandes (muitas linhas) cabem numa linha NDJSON
+LINHAS_MAX = 20000               # linhas distintas mantidas por trabalhador
+
+# ---------- lado do trabalhador (processo do pool) ----------
+_ALOCADOR = None
+_LINHAS: "OrderedDict[tuple, Linha]" = OrderedDict()
+
+
+def _inicializar_trabalhador():
+    """Importa o núcleo e cria o alocador uma única vez por processo."""
+    global _ALOCADOR
+    from core import AlocadorBobinagemReal
+    from core.backends_mochila import AUTO_AJUSTE
+    _ALOCADOR = AlocadorBobinagemReal()
+    AUTO_AJUSTE.escolher(1, [1], [1])  # carrega os limiares (já calibrados pelo servidor) antes do primeiro pedido
+
+
+def _calibrar_backends():
+    from core.backends_mochila import AUTO_AJUSTE
+    AUTO_AJUSTE.escolher(1, [1], [1])
+
+
+def _aquecer() -> int:
+    return os.getpid()
+
+
+def _bobina_de_dict(d: Dict) -> Bobina:
+    return Bobina(
+        float(d['diametro_externo']),
+        float(d['diametro_interno']),
+        float(d['largura']),
+        float(d['peso_maximo_ton']),
+        float(d.get('fator_empacotamento', 0.85)),
+    )
+
+
+def _campos_linha(d: Dict) -> tuple:
+    return (
+        str(d['codigo']),
+        float(d['diametro']),
+        float(d['comprimento']),
+        float(d['peso_por_metro_kg']),
+        float(d['raio_minimo_m']),
+    )
+
+
+def _linha_de_campos(campos: tuple, ocorrencia: int = 0) -> Linha:
+    """
+    Linha com esse conteúdo, reaproveitada se já vista por este trabalhador (o alocador não altera linhas).
+    `ocorrencia` distingue entradas iguais no mesmo pedido: a n-ésima repetição recebe sempre o mesmo
+    objeto, diferente do das demais, e o alocador nunca vê o mesmo objeto duas vezes numa frota.
+    """
+    chave = (campos, ocorrencia)
+    linha = _LINHAS.get(chave)
+    if linha is None:
+        linha = _LINHAS[chave] = Linha(*campos)
+        if len(_LINHAS) > LINHAS_MAX:
+            _LINHAS.popitem(last=False)
+    else:
+        _LINHAS.move_to_end(chave)
+    return linha
+
+
+def _linhas_do_pedido(linhas_d: List[Dict]) -> List[Linha]:
+    """Uma Linha por entrada do pedido (entradas repetidas não são fundidas)."""
+    vistas: Dict[tuple, int] = {}
+    linhas = []
+    for d in linhas_d:
+        campos = _campos_linha(d)
+        n = vistas[campos] = vistas.get(campos, -1) + 1
+        linhas.append(_linha_de_campos(campos, n))
+    return linhas
+
+
+def _planejar_lote(indices: List[int], bobinas_d: List[Dict], linhas_d: List[Dict],
+                   somente_resumo: bool, prazo: Optional[float] = None) -> List[Dict]:
+    """
+    Aloca um lote de bobinas (CPU), da mais larga para a mais estreita, e devolve os registros serializáveis.
+    prazo (time.time()): passado o prazo, o alocador para antes da próxima camada e o lote devolve []
+    — o servidor já respondeu com timeout, e o trabalhador fica livre para o próximo pedido.
+    """
+    from core import PrazoEsgotado
+    if _ALOCADOR is None:
+        _inicializar_trabalhador()
+    bobinas = [_bobina_de_dict(d) for d in bobinas_d]
+    linhas = _linhas_do_pedido(linhas_d)
+    try:
+        resultados = _ALOCADOR.alocar_frota(bobinas, linhas, prazo)
+    except PrazoEsgotado:
+        return []
+    regs: List[Dict] = []
+    for indice, (bobina, nao) in zip(indices, resultados):
+        regs.extend(registros_bobina(indice, bobina, detalhe=not somente_resumo))
+        alocado = comprimentos_alocados(bobina)
+        regs.extend(registro_nao_alocada(L, indice, alocado.get(id(L), 0.0)) for L in nao)
+    return regs
+
+
+def _lotes(bobinas: List[Dict], n: int) -> List[List[int]]:
+    """Índices (base 1) das bobinas repartidos em até n lotes equilibrados por largura."""
+    ordem = sorted(range(len(bobinas)), key=lambda i: -float(bobinas[i]['largura']))
+    n = max(1, min(n, len(ordem)))
+    return [[i + 1 for i in ordem[k::n]] for k in range(n) if ordem[k::n]]
+
+
+# ---------- lado do servidor (event loop) ----------
+class ServidorPlanejamento:
+    """Servidor NDJSON: pedidos concorrentes, resolução CPU-bound num pool de processos."""
+
+    def __init__(self, trabalhadores: Optional[int] = None, timeout_s: float = 30.0):
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.timeout_s = timeout_s
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._servidor = None
+        self._inicio = time.monotonic()
+        self._metricas = {
+            'requisicoes': 0,
+            'em_andamento': 0,
+            'concluidas': 0,
+            'erros': 0,
+            'timeouts': 0,
+            'bobinas_planejadas': 0,
+            'latencia_total_ms': 0.0,
+            'latencia_max_ms': 0.0,
+        }
+
+    # ---------- ciclo de vida ----------
+    async def iniciar(self, host: str = '127.0.0.1', porta: int = 8765, caminho_unix: Optional[str] = None):
+        loop = asyncio.get_running_loop()
+        # calibra (ou carrega) os limiares dos backends uma vez, aqui, antes do pool:
+        # os trabalhadores só leem o JSON, em vez de calibrarem todos ao mesmo tempo
+        await loop.run_in_executor(None, _calibrar_backends)
+        self._pool = ProcessPoolExecutor(max_workers=self.trabalhadores, initializer=_inicializar_trabalhador)
+        # aquece todos os trabalhadores antes do primeiro pedido
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _aquecer) for _ in range(self.trabalhadores)))
+        if caminho_unix:
+            self._servidor = await asyncio.start_unix_server(self._atender, path=caminho_unix, limit=LIMITE_LINHA)
+        else:
+            self._servidor = await asyncio.start_server(self._atender, host, porta, limit=LIMITE_LINHA)
+        return self._servidor
+
+    async def servir(self, **kwargs):
+        servidor = await self.iniciar(**kwargs)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            self.encerrar()
+
+    def encerrar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            self._servidor = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # ---------- conexão ----------
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    pedido = json.loads(linha)
+                except ValueError as e:
+                    await self._enviar(writer, {'tipo': 'erro', 'mensagem': f"JSON inválido: {e}"})
+                    continue
+                if not isinstance(pedido, dict):
+                    await self._enviar(writer, {'tipo': 'erro', 'mensagem': "Pedido deve ser um objeto JSON"})
+                    continue
+                await self._despachar(pedido, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _enviar(self, writer: asyncio.StreamWriter, registro: Dict):
+        writer.write(json.dumps(registro, ensure_ascii=False).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    async def _despachar(self, pedido: Dict, writer: asyncio.StreamWriter):
+        tipo = pedido.get('tipo', 'planejar')
+        if tipo == 'saude':
+            await self._enviar(writer, {'tipo': 'saude', 'status': 'ok', 'trabalhadores': self.trabalhadores})
+        elif tipo == 'metricas':
+            await self._enviar(writer, self.metricas())
+        elif tipo == 'planejar':
+            await self._planejar(pedido, writer)
+        else:
+            await self._enviar(writer, {'tipo': 'erro', 'id': pedido.get('id'),
+                                        'mensagem': f"Tipo de pedido desconhecido: {tipo!r}"})
+
+    def metricas(self) -> Dict:
+        m = dict(self._metricas)
+        n = m['concluidas']
+        m['latencia_media_ms'] = (m['latencia_total_ms'] / n) if n else 0.0
+        m['uptime_s'] = time.monotonic() - self._inicio
+        m['tipo'] = 'metricas'
+        return m
+
+    async def _planejar(self, pedido: Dict, writer: asyncio.StreamWriter):
+        ident = pedido.get('id')
+        m = self._metricas
+        m['requisicoes'] += 1
+        try:
+            timeout_s = float(pedido.get('timeout_s', self.timeout_s))
+            somente_resumo = bool(pedido.get('somente_resumo', False))
+            bobinas = pedido.get('bobinas') or []
+            linhas = pedido.get('linhas') or []
+            if not isinstance(bobinas, list) or not all(isinstance(b, dict) for b in bobinas):
+                raise ValueError("'bobinas' deve ser uma lista de objetos")
+            if not isinstance(linhas, list) or not all(isinstance(L, dict) for L in linhas):
+                raise ValueError("'linhas' deve ser uma lista de objetos")
+            lotes = _lotes(bobinas, self.trabalhadores)
+        except (TypeError, ValueError, KeyError) as e:
+            m['erros'] += 1
+            await self._enviar(writer, {'tipo': 'erro', 'id': ident, 'mensagem': f"Pedido inválido: {e}"})
+            return
+
+        m['em_andamento'] += 1
+        t0 = time.perf_counter()
+        prazo = time.time() + timeout_s   # relógio de parede: comparável dentro dos trabalhadores
+        loop = asyncio.get_running_loop()
+        futuros = [
+            loop.run_in_executor(self._pool, _planejar_lote, lote, [bobinas[i - 1] for i in lote],
+                                 linhas, somente_resumo, prazo)
+            for lote in lotes
+        ]
+
+        async def _transmitir():
+            alocacoes = 0
+            for proximo in asyncio.as_completed(futuros):
+                regs = await proximo
+                for reg in regs:
+                    if reg['tipo'] == 'camada':
+                        alocacoes += reg['qtd_alocacoes']
+                    elif reg['tipo'] == 'bobina':
+                        m['bobinas_planejadas'] += 1
+                    reg['id'] = ident
+                    await self._enviar(writer, reg)
+            return alocacoes
+
+        try:
+            alocacoes = await asyncio.wait_for(_transmitir(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            m['timeouts'] += 1
+            await self._enviar(writer, {'tipo': 'erro', 'id': ident,
+                                        'mensagem': f"Tempo limite de {timeout_s:g}s excedido"})
+        except Exception as e:
+            m['erros'] += 1
+            await self._enviar(writer, {'tipo': 'erro', 'id': ident, 'mensagem': str(e)})
+        else:
+            dt_ms = (time.perf_counter() - t0) * 1000.0
+            m['concluidas'] += 1
+            m['latencia_total_ms'] += dt_ms
+            m['latencia_max_ms'] = max(m['latencia_max_ms'], dt_ms)
+            await self._enviar(writer, {'tipo': 'fim', 'id': ident, 'bobinas_utilizadas': len(bobinas),
+                                        'alocacoes': alocacoes, 'duracao_ms': dt_ms})
+        finally:
+            # lotes ainda na fila do pool não precisam mais ser resolvidos; os que já estão
+            # rodando param sozinhos na próxima camada, ao passar do prazo
+            for f in futuros:
+                f.cancel()
+            m['em_andamento'] -= 1
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Serviço local de planejamento de bobinagem (NDJSON)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--porta", type=int, default=8765)
+    p.add_argument("--unix", default=None, help="caminho de socket Unix (em vez de TCP)")
+    p.add_argument("--trabalhadores", type=int, default=None, help="processos no pool (padrão: nº de CPUs)")
+    p.add_argument("--timeout", type=float, default=30.0, help="tempo limite padrão por pedido (s)")
+    args = p.parse_args(argv)
+
+    servidor = ServidorPlanejamento(trabalhadores=args.trabalhadores, timeout_s=args.timeout)
+    try:
+        asyncio.run(servidor.servir(host=args.host, porta=args.porta, caminho_unix=args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
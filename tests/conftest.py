@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _backend_fixo(monkeypatch):
+    # sem autotuning (não grava limiares no diretório do usuário durante os testes)
+    monkeypatch.setenv("ALOCADOR_BACKEND_MOCHILA", "python")
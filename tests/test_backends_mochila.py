@@ -0,0 +1,106 @@
+"""
+Paridade dos backends do knapsack: todos devem devolver o mesmo dp e as mesmas
+contagens que o backend Python puro (referência), inclusive quando os valores
+não cabem em int64 e os backends vetorizados/compilados caem no Python.
+Também a gravação dos limiares do autotuning.
+"""
+
+import json
+import random
+
+import pytest
+
+import core.backends_mochila as backends_mochila
+
+from core.backends_mochila import AutoAjuste, backends_disponiveis, resolver_lote, resolver_lote_python, trabalho
+
+
+def _instancia(rnd, valor_max=30000):
+    W = rnd.randint(1, 1200)
+    n = rnd.randint(1, 8)
+    pesos = [rnd.randint(1, max(1, W // rnd.randint(1, 4))) for _ in range(n)]
+    valores = [p * 1_000_000 + rnd.randint(0, valor_max) for p in pesos]
+    qtds = [rnd.randint(1, 30) for _ in range(n)]
+    return W, pesos, valores, qtds
+
+
+def _dp_inicial(W):
+    dp = [-1] * (W + 1)
+    dp[0] = 0
+    return dp
+
+
+def _normalizar(contagens):
+    return [[int(c) for c in cnt] for cnt in contagens]
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+@pytest.mark.parametrize("semente", range(60))
+def test_backend_igual_ao_python(backend, semente):
+    rnd = random.Random(semente)
+    W, pesos, valores, qtds = _instancia(rnd)
+    dp_ref, cnt_ref = resolver_lote_python(_dp_inicial(W), pesos, valores, qtds)
+    dp, cnt, usado = resolver_lote(_dp_inicial(W), pesos, valores, qtds, backend=backend)
+    assert usado == backend
+    assert list(dp) == dp_ref
+    assert _normalizar(cnt) == _normalizar(cnt_ref)
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_backend_continua_de_dp_existente(backend):
+    """Resolver em dois lotes (modo em blocos) dá o mesmo dp que resolver tudo de uma vez."""
+    rnd = random.Random(11)
+    W, pesos, valores, qtds = _instancia(rnd)
+    meio = len(pesos) // 2
+    dp_ref, _ = resolver_lote_python(_dp_inicial(W), pesos, valores, qtds)
+    dp, _, _ = resolver_lote(_dp_inicial(W), pesos[:meio], valores[:meio], qtds[:meio], backend=backend)
+    dp, _, _ = resolver_lote(list(dp), pesos[meio:], valores[meio:], qtds[meio:], backend=backend)
+    assert list(dp) == dp_ref
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+def test_valores_acima_de_int64_caem_no_python(backend):
+    rnd = random.Random(5)
+    W, pesos, _, qtds = _instancia(rnd)
+    valores = [(1 << 62) + rnd.randint(0, 1000) for _ in pesos]
+    dp_ref, cnt_ref = resolver_lote_python(_dp_inicial(W), pesos, valores, qtds)
+    dp, cnt, _ = resolver_lote(_dp_inicial(W), pesos, valores, qtds, backend=backend)
+    assert list(dp) == dp_ref
+    assert max(dp) >= (1 << 62)
+    assert _normalizar(cnt) == _normalizar(cnt_ref)
+
+
+def test_backend_desconhecido():
+    with pytest.raises(ValueError):
+        resolver_lote(_dp_inicial(10), [3], [3], [2], backend="inexistente")
+
+
+def test_trabalho_conta_faixas_limitadas_pela_largura():
+    assert trabalho(10, [3, 20], [5, 5]) == 11 * 3
+
+
+class _AjusteRapido(AutoAjuste):
+    TAMANHOS = [(2, 200, 3), (4, 600, 6)]
+    REPETICOES = 1
+
+
+def test_calibrar_grava_limiares_legiveis(tmp_path):
+    arquivo = tmp_path / "sub" / "limiares.json"
+    ajuste = _AjusteRapido(str(arquivo))
+    limiares = ajuste.calibrar()
+    assert [p.name for p in arquivo.parent.iterdir()] == ["limiares.json"]   # sem temporários
+    assert json.loads(arquivo.read_text(encoding="utf-8"))["limiares"] == [list(x) for x in limiares]
+    assert _AjusteRapido(str(arquivo))._carregar() == limiares
+
+
+def test_falha_na_gravacao_preserva_arquivo_anterior(tmp_path, monkeypatch):
+    arquivo = tmp_path / "limiares.json"
+    arquivo.write_text('{"backends": [], "limiares": []}', encoding="utf-8")
+
+    def _falhar(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(backends_mochila.json, "dump", _falhar)
+    _AjusteRapido(str(arquivo)).calibrar()   # melhor esforço: não propaga o erro
+    assert arquivo.read_text(encoding="utf-8") == '{"backends": [], "limiares": []}'
+    assert [p.name for p in tmp_path.iterdir()] == ["limiares.json"]
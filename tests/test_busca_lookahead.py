@@ -0,0 +1,115 @@
+"""
+Busca à frente (core.busca_lookahead) através do alocador: sem orçamento ou
+sem alternativas ela é o guloso; com k >= 1 o plano respeita DE, peso e
+volume como o guloso; a tabela de transposição não muda o resultado.
+"""
+
+import random
+
+import pytest
+
+import core.alocador_bobinagem as alocador_bobinagem
+from core import AlocadorBobinagemReal, EstadoRestricoes
+from core.busca_lookahead import BuscaLookahead, EstadoBusca
+from models import Bobina, Linha
+
+EPS = 1e-9
+
+
+def _instancia(semente):
+    rnd = random.Random(semente)
+    bobina = (rnd.uniform(1.8, 3.5), 1.0, rnd.uniform(0.4, 1.2), rnd.uniform(2.0, 40.0))
+    linhas = [
+        (f"L{i}", rnd.uniform(20.0, 120.0), rnd.uniform(50.0, 800.0), rnd.uniform(1.0, 30.0), rnd.uniform(0.3, 0.6))
+        for i in range(rnd.randint(3, 9))
+    ]
+    return bobina, linhas
+
+
+def _planejar(instancia, **kwargs):
+    bobina, linhas = instancia
+    b, nao = AlocadorBobinagemReal(**kwargs).alocar_em_bobina(Bobina(*bobina), [Linha(*L) for L in linhas])
+    return b, nao
+
+
+def _assinatura(bobina):
+    return [
+        (round(c.diametro_base, 9),
+         sorted((reg['objeto'].codigo, reg.get('voltas_usadas'), round(reg.get('comprimento_alocado') or 0.0, 6))
+                for reg in c.linhas))
+        for c in bobina.camadas
+    ]
+
+
+@pytest.mark.parametrize("semente", range(15))
+def test_orcamento_zero_volta_ao_guloso(semente):
+    inst = _instancia(semente)
+    guloso, _ = _planejar(inst)
+    sem_orcamento, _ = _planejar(inst, lookahead=3, orcamento_cpu_s=0.0)
+    assert _assinatura(sem_orcamento) == _assinatura(guloso)
+
+
+@pytest.mark.parametrize("semente", range(15))
+def test_um_ramo_e_o_guloso(semente):
+    inst = _instancia(semente)
+    guloso, _ = _planejar(inst, lookahead=0)
+    um_ramo, _ = _planejar(inst, lookahead=2, ramos_max=1)
+    assert _assinatura(um_ramo) == _assinatura(guloso)
+
+
+@pytest.mark.parametrize("lookahead", [1, 2])
+@pytest.mark.parametrize("semente", range(20))
+def test_limites_respeitados(semente, lookahead):
+    # mesmas garantias do guloso: nenhuma camada passa do DE e cada alocação cabe no peso/volume
+    # que restavam quando a camada começou (o limite é por linha, como em limites_por_linha)
+    bobina, _ = _planejar(_instancia(semente), lookahead=lookahead, ramos_max=3)
+    peso, volume = 0.0, 0.0
+    for camada in bobina.camadas:
+        espessura = max(reg['objeto'].diametro for reg in camada.linhas) / 1000.0
+        assert camada.diametro_base + 2.0 * espessura <= bobina.diametro_externo + EPS
+        assert peso <= bobina.peso_maximo_ton + EPS and volume <= bobina.volume_cap_m3 + EPS
+        for reg in camada.linhas:
+            L, comp = reg['objeto'], reg['comprimento_alocado']
+            assert L.peso_por_metro_kg * comp * 0.001 <= bobina.peso_maximo_ton - peso + 1e-6
+            assert L.area_m2 * comp <= bobina.volume_cap_m3 - volume + 1e-6
+        peso += sum(reg['objeto'].peso_por_metro_kg * reg['comprimento_alocado'] * 0.001 for reg in camada.linhas)
+        volume += sum(reg['objeto'].area_m2 * reg['comprimento_alocado'] for reg in camada.linhas)
+    assert peso == pytest.approx(bobina.peso_atual_ton)
+
+
+class _SemMemoria(dict):
+    def __setitem__(self, chave, valor):
+        pass
+
+
+class _BuscaSemTabela(BuscaLookahead):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tt = _SemMemoria()
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_tabela_de_transposicao_nao_muda_o_plano(semente, monkeypatch):
+    inst = _instancia(semente)
+    com_tabela, _ = _planejar(inst, lookahead=3, ramos_max=2)
+    monkeypatch.setattr(alocador_bobinagem, "BuscaLookahead", _BuscaSemTabela)
+    sem_tabela, _ = _planejar(inst, lookahead=3, ramos_max=2)
+    assert _assinatura(com_tabela) == _assinatura(sem_tabela)
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_valor_de_horizonte_maior_nao_serve_para_menor(semente):
+    (de, di, largura, peso), linhas = _instancia(semente)
+    linhas = [Linha(*L) for L in linhas]
+
+    def _busca():
+        bobina = Bobina(de, di, largura, peso)
+        return BuscaLookahead(AlocadorBobinagemReal(), linhas, de, largura, EstadoRestricoes(bobina, linhas))
+
+    inicio = EstadoBusca(di / 2.0, tuple(L.comprimento for L in linhas), 0.0, 0.0)
+    reusada = _busca()
+    fundo = reusada._dfs(inicio, 3)
+    raso = reusada._dfs(inicio, 1)
+    assert raso == _busca()._dfs(inicio, 1)
+    assert fundo == _busca()._dfs(inicio, 3)
+    assert raso <= fundo + EPS
@@ -0,0 +1,112 @@
+"""
+Escritores em streaming (JSONL/CSV): contagem de registros por tipo contra o
+plano, somente_resumo, e o resumo ausente quando a geração falha no meio.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from core import AlocadorBobinagemReal
+from models import Bobina, Linha
+from services.escritores_relatorio import CAMPOS, EscritorCSV, EscritorJSONL, criar_escritor
+
+
+def _plano():
+    bobinas = [Bobina(3.0, 1.0, 1.5, 50.0), Bobina(2.0, 1.0, 1.0, 5.0)]
+    linhas = [Linha(f"L{i}", 30.0 + 15 * i, 200.0 + 150 * i, 3.0 + i, 0.4) for i in range(5)]
+    return AlocadorBobinagemReal().alocar_frota(bobinas, linhas)
+
+
+def _gravar(escritor, plano):
+    with escritor as esc:
+        for bobina, nao in plano:
+            esc.adicionar_bobina(bobina)
+            esc.adicionar_nao_alocadas(nao, bobina=esc.bobinas_escritas)
+
+
+def _ler_jsonl(buf):
+    return [json.loads(linha) for linha in buf.getvalue().splitlines()]
+
+
+def _ler_csv(buf):
+    return list(csv.DictReader(io.StringIO(buf.getvalue())))
+
+
+def _contar(regs):
+    n = {}
+    for r in regs:
+        n[r['tipo']] = n.get(r['tipo'], 0) + 1
+    return n
+
+
+def _esperado(plano, detalhe=True):
+    n = {
+        'bobina': len(plano),
+        'camada': sum(len(b.camadas) for b, _ in plano),
+        'nao_alocada': sum(len(nao) for _, nao in plano),
+        'resumo': 1,
+    }
+    if detalhe:
+        n['alocacao'] = sum(len(c.linhas) for b, _ in plano for c in b.camadas)
+    return {k: v for k, v in n.items() if v}
+
+
+@pytest.mark.parametrize("cls, ler", [(EscritorJSONL, _ler_jsonl), (EscritorCSV, _ler_csv)])
+@pytest.mark.parametrize("somente_resumo", [False, True])
+def test_contagem_de_registros(cls, ler, somente_resumo):
+    plano = _plano()
+    buf = io.StringIO()
+    _gravar(cls(buf, somente_resumo=somente_resumo), plano)
+    regs = ler(buf)
+    assert _contar(regs) == _esperado(plano, detalhe=not somente_resumo)
+    resumo = regs[-1]
+    assert resumo['tipo'] == 'resumo'
+    assert int(resumo['bobinas_utilizadas']) == len(plano)
+    assert int(resumo['alocacoes']) == sum(len(c.linhas) for b, _ in plano for c in b.camadas)
+
+
+def test_csv_tem_colunas_fixas():
+    buf = io.StringIO()
+    _gravar(EscritorCSV(buf), _plano())
+    assert next(csv.reader(io.StringIO(buf.getvalue()))) == CAMPOS
+
+
+def test_restante_da_ultima_bobina():
+    plano = _plano()
+    buf = io.StringIO()
+    _gravar(EscritorJSONL(buf), plano)
+    for r in _ler_jsonl(buf):
+        if r['tipo'] == 'nao_alocada':
+            assert 0.0 <= r['comprimento_restante_m'] <= r['comprimento_m']
+
+
+@pytest.mark.parametrize("cls, ler", [(EscritorJSONL, _ler_jsonl), (EscritorCSV, _ler_csv)])
+def test_excecao_omite_resumo(cls, ler):
+    plano = _plano()
+    buf = io.StringIO()
+    with pytest.raises(RuntimeError):
+        with cls(buf) as esc:
+            esc.adicionar_bobina(plano[0][0])
+            raise RuntimeError("falha no meio do plano")
+    regs = ler(buf)
+    assert regs and all(r['tipo'] != 'resumo' for r in regs)
+
+
+def test_abortar_fecha_arquivo_sem_resumo(tmp_path):
+    caminho = tmp_path / "plano.jsonl"
+    esc = EscritorJSONL(str(caminho))
+    esc.adicionar_bobina(_plano()[0][0])
+    esc.abortar()
+    esc.fechar()   # depois de abortar, não grava mais nada
+    regs = [json.loads(linha) for linha in caminho.read_text(encoding='utf-8').splitlines()]
+    assert regs[0]['tipo'] == 'bobina'
+    assert all(r['tipo'] != 'resumo' for r in regs)
+
+
+def test_criar_escritor():
+    assert isinstance(criar_escritor('csv', io.StringIO()), EscritorCSV)
+    with pytest.raises(ValueError):
+        criar_escritor('parquet', io.StringIO())
@@ -0,0 +1,77 @@
+"""
+Exportação .xlsx (EscritorExcel): o arquivo só existe se o plano terminou
+e pode ser lido de novo pela ingestão, com uma entrada por linha pendente.
+"""
+
+import pytest
+
+from core import AlocadorBobinagemReal
+from models import Bobina, Linha
+from services.escritores_relatorio import comprimentos_alocados
+from services.exportador_excel import EscritorExcel
+from services.ingestao import ingerir_excel
+
+
+def _frota():
+    bobinas = [Bobina(4.0, 1.0, 2.0, 200.0), Bobina(1.4, 1.0, 0.5, 2.0), Bobina(2.0, 1.0, 1.0, 5.0)]
+    linhas = [Linha(f"L{i}", 40.0 + 10 * i, 300.0 + 100 * i, 5.0 + i, 0.4) for i in range(6)]
+    return bobinas, linhas, AlocadorBobinagemReal().alocar_frota(bobinas, linhas)
+
+
+def _exportar(caminho, resultados):
+    with EscritorExcel(str(caminho)) as esc:
+        for bobina, nao in resultados:
+            esc.adicionar_bobina(bobina)
+            esc.adicionar_nao_alocadas(nao, bobina=esc.bobinas_escritas)
+
+
+def test_plano_exportado_volta_para_a_ingestao(tmp_path):
+    bobinas, linhas, resultados = _frota()
+    caminho = tmp_path / "plano.xlsx"
+    _exportar(caminho, resultados)
+
+    lido = ingerir_excel(str(caminho))
+    assert lido.rejeicoes.empty
+    assert len(lido.bobinas) == len(bobinas)
+    assert [(b.diametro_externo, b.largura, b.peso_maximo_ton) for b in lido.bobinas] == \
+        [(b.diametro_externo, b.largura, b.peso_maximo_ton) for b in bobinas]
+
+    # uma entrada por ID, só para linhas que nenhuma bobina recebeu por inteiro,
+    # com o menor remanescente entre as bobinas
+    pendentes = {}
+    for _, nao in resultados:
+        for L in nao:
+            pendentes[L.codigo] = pendentes.get(L.codigo, 0) + 1
+    esperadas = sorted(c for c, n in pendentes.items() if n == len(bobinas))
+    assert sorted(L.codigo for L in lido.linhas) == esperadas
+    menor = {}
+    for bobina, nao in resultados:
+        alocado = comprimentos_alocados(bobina)
+        for L in nao:
+            restante = L.comprimento - alocado.get(id(L), 0.0)
+            menor[L.codigo] = min(menor.get(L.codigo, restante), restante)
+    assert {L.codigo: L.comprimento for L in lido.linhas} == pytest.approx({c: menor[c] for c in esperadas})
+
+
+def test_linha_alocada_inteira_em_alguma_bobina_nao_volta(tmp_path):
+    _, linhas, resultados = _frota()
+    (b1, _), (b2, _), (b3, _) = resultados
+    # L0 sobra em todas as bobinas; L1 sobra só em duas (a terceira a recebeu inteira)
+    caminho = tmp_path / "plano.xlsx"
+    _exportar(caminho, [(b1, linhas[:2]), (b2, linhas[:2]), (b3, linhas[:1])])
+    assert [L.codigo for L in ingerir_excel(str(caminho)).linhas] == ["L0"]
+
+
+def test_excecao_nao_grava_xlsx(tmp_path):
+    _, _, resultados = _frota()
+    caminho = tmp_path / "plano.xlsx"
+    with pytest.raises(RuntimeError):
+        with EscritorExcel(str(caminho)) as esc:
+            esc.adicionar_bobina(resultados[0][0])
+            raise RuntimeError("falha no meio do plano")
+    assert not caminho.exists()
+
+
+def test_exige_caminho():
+    with pytest.raises(ValueError):
+        EscritorExcel(None)
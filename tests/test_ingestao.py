@@ -0,0 +1,135 @@
+"""
+Ingestão vetorizada (services/ingestao.py): coerção de tipos, regras de
+validação, número da linha na planilha e construção dos modelos.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.ingestao import COLUNAS_REJEICOES, ingerir, normalizar_bobinas, normalizar_linhas
+
+
+def _df_linhas(**colunas):
+    base = {
+        'ID': ['A', 'B'],
+        'Diâmetro (m)': [0.05, 0.1],
+        'Comprimento Necessário (m)': [100.0, 200.0],
+        'Peso por Metro (kg/m)': [2.0, 3.0],
+        'Raio Mínimo (m)': [0.4, 0.5],
+    }
+    base.update(colunas)
+    return pd.DataFrame(base)
+
+
+def _df_bobinas(**colunas):
+    base = {
+        'ID': ['B1', 'B2'],
+        'Diâmetro Externo (m)': [3.0, 4.0],
+        'Diâmetro Interno (m)': [1.0, 1.5],
+        'Largura (m)': [2.0, 2.5],
+        'Peso Máximo (kg)': [20000.0, 30000.0],
+    }
+    base.update(colunas)
+    return pd.DataFrame(base)
+
+
+def _motivos(rejeicoes):
+    return {int(n): m for n, m in zip(rejeicoes['Linha Planilha'], rejeicoes['Motivos'])}
+
+
+def test_linhas_validas_viram_modelos():
+    linhas, rej = normalizar_linhas(_df_linhas())
+    assert rej.empty and list(rej.columns) == COLUNAS_REJEICOES
+    assert [L.codigo for L in linhas] == ['A', 'B']
+    assert [L.diametro for L in linhas] == pytest.approx([50.0, 100.0])   # m -> mm
+    assert [L.comprimento for L in linhas] == [100.0, 200.0]
+    assert [L.peso_por_metro_kg for L in linhas] == [2.0, 3.0]
+    assert [L.raio_minimo_m for L in linhas] == [0.4, 0.5]
+    # atributos derivados calculados na construção em lote
+    assert linhas[0].area_m2 == pytest.approx(np.pi * 0.025 ** 2)
+    assert all(type(L.diametro) is float for L in linhas)
+
+
+def test_linhas_texto_nan_e_valores_invalidos():
+    df = pd.DataFrame({
+        'ID': ['ok', 'texto', 'nan', 'zero', 'neg', '  ', None],
+        'Diâmetro (m)': [0.05, 'abc', np.nan, 0.0, 0.05, 0.05, 0.05],
+        'Comprimento Necessário (m)': [100.0, 100.0, 100.0, 100.0, 100.0, 100.0, 100.0],
+        'Peso por Metro (kg/m)': [1.0, 1.0, 1.0, 1.0, -1.0, 1.0, 1.0],
+        'Raio Mínimo (m)': [0.4, 0.4, 0.4, 0.4, -0.1, 0.4, 0.4],
+    })
+    linhas, rej = normalizar_linhas(df)
+    assert [L.codigo for L in linhas] == ['ok']
+    motivos = _motivos(rej)
+    assert sorted(motivos) == [3, 4, 5, 6, 7, 8]   # cabeçalho na linha 1
+    assert motivos[3] == 'Diâmetro ausente/inválido'
+    assert motivos[4] == 'Diâmetro ausente/inválido'
+    assert motivos[5] == 'Diâmetro <= 0'
+    assert motivos[6] == 'Peso por metro negativo; Raio mínimo negativo'   # todos os motivos da linha
+    assert motivos[7] == motivos[8] == 'ID vazio'
+    assert set(rej['Aba']) == {'Linhas'}
+    assert rej.set_index('Linha Planilha').loc[6, 'ID'] == 'neg'
+
+
+def test_peso_por_metro_zero_e_aceito():
+    linhas, rej = normalizar_linhas(_df_linhas(**{'Peso por Metro (kg/m)': [0.0, 3.0]}))
+    assert rej.empty and linhas[0].peso_por_metro_kg == 0.0
+
+
+def test_coluna_obrigatoria_ausente():
+    with pytest.raises(Exception, match="Raio Mínimo"):
+        normalizar_linhas(_df_linhas().drop(columns=['Raio Mínimo (m)']))
+
+
+def test_bobinas_validas_e_unidades():
+    bobinas, rej = normalizar_bobinas(_df_bobinas(), fator_empacotamento=0.8)
+    assert rej.empty
+    assert [b.peso_maximo_ton for b in bobinas] == [20.0, 30.0]   # kg -> ton
+    assert [b.fator_empacotamento for b in bobinas] == [0.8, 0.8]
+    assert bobinas[0].volume_cap_m3 == pytest.approx(bobinas[0].volume_total_m3 * 0.8)
+
+
+def test_bobinas_de_menor_ou_igual_di():
+    df = _df_bobinas(**{'Diâmetro Externo (m)': [1.0, 'x'], 'Largura (m)': [2.0, 0.0]})
+    bobinas, rej = normalizar_bobinas(df)
+    assert bobinas == []
+    motivos = _motivos(rej)
+    assert motivos[2] == 'Diâmetro externo <= interno'
+    assert motivos[3] == 'Diâmetro externo ausente/inválido; Largura <= 0'
+
+
+def test_id_da_bobina_opcional_e_alias_de_largura():
+    df = _df_bobinas().drop(columns=['ID']).rename(columns={'Largura (m)': 'Comprimento (m)'})
+    df.loc[1, 'Peso Máximo (kg)'] = -5.0
+    bobinas, rej = normalizar_bobinas(df)
+    assert len(bobinas) == 1 and bobinas[0].largura == 2.0
+    # sem coluna ID, a rejeição identifica a bobina pela linha da planilha
+    assert rej['ID'].tolist() == ['3'] and rej['Linha Planilha'].tolist() == [3]
+
+
+def test_ingerir_junta_rejeicoes_das_duas_abas():
+    res = ingerir(_df_bobinas(**{'Largura (m)': [2.0, -1.0]}), _df_linhas(ID=['A', '']))
+    assert len(res.bobinas) == 1 and len(res.linhas) == 1
+    assert res.rejeicoes['Aba'].tolist() == ['Bobinas', 'Linhas']
+    assert res.resumo_rejeicoes() == "Bobinas: 1, Linhas: 1"
+    assert ingerir(_df_bobinas(), _df_linhas()).resumo_rejeicoes() == "nenhuma linha rejeitada"
+
+
+def test_muitas_linhas_construidas_em_lote():
+    n = 5000
+    rnd = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'ID': [f"L{i}" for i in range(n)],
+        'Diâmetro (m)': rnd.uniform(0.01, 0.2, n).astype(object),
+        'Comprimento Necessário (m)': rnd.uniform(10, 1000, n),
+        'Peso por Metro (kg/m)': rnd.uniform(0, 30, n),
+        'Raio Mínimo (m)': rnd.uniform(0, 1, n),
+    })
+    df.loc[::7, 'Diâmetro (m)'] = 'x'
+    linhas, rej = normalizar_linhas(df)
+    assert len(linhas) + len(rej) == n
+    assert rej['Linha Planilha'].tolist() == list(range(2, n + 2, 7))
+    validos = df.drop(index=df.index[::7])
+    assert [L.codigo for L in linhas] == validos['ID'].tolist()
+    assert [L.diametro for L in linhas] == pytest.approx((validos['Diâmetro (m)'].astype(float) * 1000).tolist())
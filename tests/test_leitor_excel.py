@@ -0,0 +1,89 @@
+"""
+Estimativa vetorizada de frota (LeitorExcel.estimar_frota/resumo_frota)
+contra o empilhamento linha a linha de calcular_camadas/calcular_resumo.
+"""
+
+import random
+
+import pytest
+
+from services.leitor_excel import LeitorExcel
+
+
+def _linhas(rnd, n):
+    return [{
+        'ID': f"L{i}",
+        'Diâmetro (m)': rnd.uniform(0.02, 0.3),
+        'Comprimento Necessário (m)': rnd.uniform(10.0, 500.0),
+        'Peso por Metro (kg/m)': rnd.uniform(0.5, 20.0),
+    } for i in range(n)]
+
+
+def _bobina(rnd, de, ident="B1"):
+    return {'ID': ident, 'Diâmetro Interno (m)': 1.0, 'Diâmetro Externo (m)': de,
+            'Peso Máximo (kg)': float('inf')}
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_estimativa_igual_a_calcular_camadas_quando_tudo_cabe(semente):
+    rnd = random.Random(semente)
+    linhas = _linhas(rnd, rnd.randint(1, 25))
+    bobina = _bobina(rnd, de=1.0 + 2.0 * sum(L['Diâmetro (m)'] for L in linhas) + 0.01)
+
+    camadas, rejeitadas = LeitorExcel.calcular_camadas_com_rejeicoes(bobina, linhas)
+    est = LeitorExcel.estimar_frota([bobina], linhas)
+    assert not rejeitadas and est['Cabe'].all()
+    assert est['Linha ID'].tolist() == [c['Linha ID'] for c in camadas]
+    assert est['Camada'].tolist() == [c['Camada'] for c in camadas]
+    assert est['Raio Externo'].tolist() == pytest.approx([c['Raio Externo'] for c in camadas])
+    assert est['Raio Interno'].tolist() == pytest.approx([c['Raio Interno'] for c in camadas])
+
+    resumo = LeitorExcel.calcular_resumo(bobina, camadas)
+    (linha,) = LeitorExcel.resumo_frota(est).itertuples()
+    assert linha.linhas_que_cabem == len(camadas)
+    assert linha.peso_total == pytest.approx(resumo['peso_total'])
+    assert linha.diametro_final == pytest.approx(resumo['diametro_final'])
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_estimativa_e_prefixo_de_calcular_camadas(semente):
+    rnd = random.Random(semente)
+    linhas = _linhas(rnd, rnd.randint(1, 25))
+    bobina = _bobina(rnd, de=rnd.uniform(1.05, 3.0))
+
+    camadas, rejeitadas = LeitorExcel.calcular_camadas_com_rejeicoes(bobina, linhas)
+    est = LeitorExcel.estimar_frota([bobina], linhas)
+    cabem = est[est['Cabe']]
+    # a estimativa para na primeira linha que não cabe; calcular_camadas pula e segue
+    assert cabem['Linha ID'].tolist() == [c['Linha ID'] for c in camadas[:len(cabem)]]
+    assert len(camadas) + len(rejeitadas) == len(linhas)
+    if rejeitadas:
+        assert rejeitadas[0]['Linha ID'] == est.loc[len(cabem), 'Linha ID']
+        assert all(r['Diâmetro Final (m)'] > bobina['Diâmetro Externo (m)'] for r in rejeitadas)
+
+
+def test_calcular_camadas_nao_imprime(capsys):
+    bobina = {'ID': 'B1', 'Diâmetro Interno (m)': 1.0, 'Diâmetro Externo (m)': 1.3}
+    linhas = [{'ID': 'G', 'Diâmetro (m)': 0.2, 'Comprimento Necessário (m)': 1.0, 'Peso por Metro (kg/m)': 1.0},
+              {'ID': 'F', 'Diâmetro (m)': 0.1, 'Comprimento Necessário (m)': 1.0, 'Peso por Metro (kg/m)': 1.0}]
+    camadas = LeitorExcel.calcular_camadas(bobina, linhas)
+    assert [c['Linha ID'] for c in camadas] == ['F']
+    assert capsys.readouterr().out == ''
+
+
+def test_resumo_frota_por_posicao_e_di_sem_linhas():
+    linhas = [{'ID': 'L1', 'Diâmetro (m)': 0.1, 'Comprimento Necessário (m)': 100.0, 'Peso por Metro (kg/m)': 2.0}]
+    bobinas = [
+        {'ID': 'X', 'Diâmetro Interno (m)': 1.0, 'Diâmetro Externo (m)': 2.0, 'Peso Máximo (kg)': 1000.0},
+        {'ID': 'X', 'Diâmetro Interno (m)': 1.5, 'Diâmetro Externo (m)': 1.6, 'Peso Máximo (kg)': 1000.0},
+        {'ID': 'Y', 'Diâmetro Interno (m)': 1.0, 'Diâmetro Externo (m)': 2.0, 'Peso Máximo (kg)': 100.0},
+    ]
+    resumo = LeitorExcel.resumo_frota(LeitorExcel.estimar_frota(bobinas, linhas))
+    assert resumo.index.tolist() == [1, 2, 3]
+    assert resumo['Bobina'].tolist() == ['X', 'X', 'Y']
+    assert resumo['linhas_que_cabem'].tolist() == [1, 0, 0]
+    assert resumo['peso_total'].tolist() == [200.0, 0.0, 0.0]
+    # sem linha nenhuma, o diâmetro final é o DI (como calcular_resumo)
+    assert resumo['diametro_final'].tolist() == pytest.approx([1.2, 1.5, 1.0])
+    for bobina, (_, linha) in zip(bobinas[1:], resumo.iloc[1:].iterrows()):
+        assert linha['diametro_final'] == LeitorExcel.calcular_resumo(bobina, [])['diametro_final']
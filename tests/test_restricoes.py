@@ -0,0 +1,98 @@
+"""
+EstadoRestricoes (estado incremental) contra a implementação de referência:
+limites_por_linha + ValidadorAlocacao, e Bobina.adicionar_camada para o acúmulo.
+"""
+
+import math
+import random
+
+import pytest
+
+from models import Bobina, Camada, Linha
+from core.restricoes import EstadoRestricoes, limites_por_linha
+from core.validador import ValidadorAlocacao
+
+
+def _linhas(rnd, n):
+    linhas = []
+    for i in range(n):
+        kgpm = 0.0 if rnd.random() < 0.15 else rnd.uniform(0.5, 80.0)
+        linhas.append(Linha(f"L{i}", rnd.uniform(20.0, 250.0), rnd.uniform(50.0, 3000.0), kgpm, rnd.uniform(0.3, 2.5)))
+    return linhas
+
+
+def _bobina(rnd):
+    di = rnd.uniform(1.0, 3.0)
+    return Bobina(di + rnd.uniform(0.5, 3.0), di, rnd.uniform(0.5, 5.0), rnd.uniform(1.0, 300.0),
+                  rnd.uniform(0.6, 0.95))
+
+
+def _camada(rnd, linhas):
+    camada = Camada(diametro_base=2.0)
+    for L in rnd.sample(linhas, rnd.randint(1, len(linhas))):
+        comp = None if rnd.random() < 0.1 else rnd.uniform(1.0, 500.0)
+        camada.adicionar_linha(L, 0.0, 1.0, comprimento_alocado=comp)
+    return camada
+
+
+def _conferir_limites(rnd, bobina, estado, linhas):
+    validador = ValidadorAlocacao()
+    comps = [0.0 if rnd.random() < 0.05 else rnd.uniform(1.0, 30.0) for _ in linhas]
+    rems = [rnd.uniform(0.0, L.comprimento) for L in linhas]
+    esperado = [limites_por_linha(bobina, L, c, r, validador) for L, c, r in zip(linhas, comps, rems)]
+    assert estado.limites(linhas, comps, rems) == esperado
+    for L in linhas:
+        assert estado.max_comprimento_por_peso(L) == validador.max_comprimento_por_peso(bobina, L)
+        assert estado.max_comprimento_por_volume(L) == validador.max_comprimento_por_volume(bobina, L)
+
+
+@pytest.mark.parametrize("semente", range(200))
+def test_limites_e_acumulo_iguais_a_referencia(semente):
+    rnd = random.Random(semente)
+    linhas = _linhas(rnd, rnd.randint(1, 12))
+    bobina = _bobina(rnd)
+    estado = EstadoRestricoes(bobina, linhas)
+
+    for _ in range(rnd.randint(1, 6)):
+        _conferir_limites(rnd, bobina, estado, linhas)
+        camada = _camada(rnd, linhas)
+        bobina.adicionar_camada(camada)
+        estado.registrar_camada(camada)
+        assert estado.peso_atual_ton == bobina.peso_atual_ton
+        assert estado.volume_usado_m3 == bobina.volume_usado_m3
+    _conferir_limites(rnd, bobina, estado, linhas)
+
+
+def test_bobina_cheia_nao_aceita_faixas():
+    rnd = random.Random(1)
+    linhas = _linhas(rnd, 6)
+    bobina = Bobina(4.0, 2.0, 3.0, 10.0)
+    bobina.peso_atual_ton = bobina.peso_maximo_ton
+    bobina.volume_usado_m3 = bobina.volume_cap_m3 * 1.01
+    estado = EstadoRestricoes(bobina, linhas)
+    comps = [10.0] * len(linhas)
+    rems = [L.comprimento for L in linhas]
+    assert estado.limites(linhas, comps, rems) == [0] * len(linhas)
+    assert estado.limites(linhas, comps, rems) == [
+        limites_por_linha(bobina, L, 10.0, r, ValidadorAlocacao()) for L, r in zip(linhas, rems)
+    ]
+
+
+def test_peso_por_metro_zero_limitado_por_volume_e_remanescente():
+    L = Linha("Z", 100.0, 1000.0, 0.0, 1.0)
+    bobina = Bobina(4.0, 2.0, 3.0, 10.0)
+    estado = EstadoRestricoes(bobina, [L])
+    comp = 2.0 * math.pi * 1.05
+    esperado = limites_por_linha(bobina, L, comp, L.comprimento, ValidadorAlocacao())
+    assert estado.limites([L], [comp], [L.comprimento]) == [esperado]
+    assert esperado == int(math.floor(L.comprimento / comp))
+
+
+def test_simular_nao_altera_o_estado_real():
+    rnd = random.Random(7)
+    linhas = _linhas(rnd, 5)
+    bobina = _bobina(rnd)
+    estado = EstadoRestricoes(bobina, linhas)
+    sim = estado.simular(bobina.peso_maximo_ton, 0.0)
+    assert sim.limites(linhas, [5.0] * 5, [L.comprimento for L in linhas]) == [0] * 5
+    assert estado.peso_atual_ton == bobina.peso_atual_ton
@@ -0,0 +1,100 @@
+"""
+A seleção reconstruída de uma tabela compartilhada (resolvida para a maior
+largura) e da tabela em blocos (orçamento de memória) deve coincidir com
+selecionar_faixas resolvido para cada largura; em instâncias pequenas, o
+valor escolhido é comparado com o ótimo por força bruta.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from core.backends_mochila import backends_disponiveis
+from core.objetivos import valor_largura_comprimento
+from core.selecionador_faixas import (
+    ItemFaixa, montar_tabela, selecionar_faixas, selecionar_faixas_por_largura,
+)
+
+
+def _itens(rnd, n):
+    itens = []
+    for i in range(n):
+        d_m = rnd.uniform(0.02, 0.25)
+        passo = d_m * 1.1
+        itens.append(ItemFaixa(
+            linha=f"L{i}", passo_m=passo, comp_por_faixa_m=rnd.uniform(5.0, 30.0),
+            qtd_max=rnd.randint(1, 12), r_mid_m=1.0, d_m=d_m, sobra_linha_m=rnd.uniform(10.0, 500.0),
+        ))
+    return itens
+
+
+def _largura_mm(itens, escolhas):
+    passos = {t.linha: int(round(t.passo_m * 1000.0)) for t in itens}
+    return sum(passos[L] * c for L, c in escolhas.items())
+
+
+@pytest.mark.parametrize("semente", range(8))
+def test_tabela_compartilhada_e_em_blocos_iguais_por_largura(semente):
+    rnd = random.Random(semente)
+    itens = _itens(rnd, 48)
+    larguras = sorted({round(rnd.uniform(0.2, 1.5), 3) for _ in range(5)}, reverse=True)
+    valor = valor_largura_comprimento
+
+    compartilhada = montar_tabela(itens, larguras[0], valor)
+    em_blocos = montar_tabela(itens, larguras[0], valor, memoria_max_bytes=1)
+    assert em_blocos.contagens is None and em_blocos.pontos
+
+    por_largura = selecionar_faixas_por_largura(itens, larguras, valor)
+    for lm in larguras:
+        esperado = selecionar_faixas(itens, lm, valor)
+        assert compartilhada.selecionar(lm) == esperado
+        assert em_blocos.selecionar(lm) == esperado
+        assert por_largura[lm] == esperado
+        limites = {t.linha: t.qtd_max for t in itens}
+        assert all(0 < c <= limites[L] for L, c in esperado.items())
+        assert _largura_mm(itens, esperado) <= int(round(lm * 1000.0))
+
+
+def test_largura_acima_da_tabela():
+    itens = _itens(random.Random(0), 4)
+    tabela = montar_tabela(itens, 0.5, valor_largura_comprimento)
+    with pytest.raises(ValueError):
+        tabela.selecionar(0.6)
+
+
+def _valor(itens, escolhas, valor_fn):
+    valores = {t.linha: valor_fn(t.passo_m, t.comp_por_faixa_m, t.sobra_linha_m) for t in itens}
+    return sum(valores[L] * c for L, c in escolhas.items())
+
+
+def _otimo_forca_bruta(itens, largura_m, valor_fn):
+    W = int(round(largura_m * 1000.0))
+    passos = [int(round(t.passo_m * 1000.0)) for t in itens]
+    valores = [valor_fn(t.passo_m, t.comp_por_faixa_m, t.sobra_linha_m) for t in itens]
+    melhor = 0
+    for qtds in itertools.product(*(range(t.qtd_max + 1) for t in itens)):
+        if sum(p * q for p, q in zip(passos, qtds)) <= W:
+            melhor = max(melhor, sum(v * q for v, q in zip(valores, qtds)))
+    return melhor
+
+
+@pytest.mark.parametrize("backend", backends_disponiveis())
+@pytest.mark.parametrize("semente", range(30))
+def test_valor_otimo_contra_forca_bruta(semente, backend):
+    rnd = random.Random(1000 + semente)
+    itens = [
+        ItemFaixa(linha=f"L{i}", passo_m=rnd.uniform(0.03, 0.3), comp_por_faixa_m=rnd.uniform(5.0, 30.0),
+                  qtd_max=rnd.randint(1, 4), r_mid_m=1.0, d_m=0.1, sobra_linha_m=rnd.uniform(10.0, 500.0))
+        for i in range(rnd.randint(1, 5))
+    ]
+    larguras = sorted({round(rnd.uniform(0.05, 1.2), 3) for _ in range(4)}, reverse=True)
+    valor = valor_largura_comprimento
+
+    compartilhada = montar_tabela(itens, larguras[0], valor, backend=backend)
+    em_blocos = montar_tabela(itens, larguras[0], valor, backend=backend, memoria_max_bytes=1)
+    for lm in larguras:
+        otimo = _otimo_forca_bruta(itens, lm, valor)
+        for escolhas in (compartilhada.selecionar(lm), em_blocos.selecionar(lm), selecionar_faixas(itens, lm, valor)):
+            assert _largura_mm(itens, escolhas) <= int(round(lm * 1000.0))
+            assert _valor(itens, escolhas, valor) == otimo
@@ -0,0 +1,60 @@
+"""
+Lado do trabalhador do serviço (services/servidor.py), chamado no próprio
+processo: entradas repetidas no pedido, lotes por largura.
+"""
+
+import time
+
+import pytest
+
+from services import servidor
+
+BOBINA = {"diametro_externo": 3.0, "diametro_interno": 1.0, "largura": 2.0,
+          "peso_maximo_ton": 30.0, "fator_empacotamento": 0.85}
+LINHA = {"codigo": "L1", "diametro": 100.0, "comprimento": 400.0,
+         "peso_por_metro_kg": 50.0, "raio_minimo_m": 0.4}
+
+
+def _por_tipo(regs, tipo):
+    return [r for r in regs if r['tipo'] == tipo]
+
+
+def test_entradas_repetidas_sao_linhas_distintas():
+    regs = servidor._planejar_lote([1], [BOBINA], [dict(LINHA), dict(LINHA)], False)
+
+    alocado = sum(r['comprimento_m'] for r in _por_tipo(regs, 'alocacao'))
+    peso = sum(r['peso_ton'] for r in _por_tipo(regs, 'alocacao'))
+    (bob,) = _por_tipo(regs, 'bobina')
+    assert peso <= BOBINA['peso_maximo_ton'] + 1e-9
+    assert bob['peso_usado_ton'] <= BOBINA['peso_maximo_ton'] + 1e-9
+    # as duas entradas estão contabilizadas: o que foi alocado mais o que ficou faltando
+    restante = sum(r['comprimento_restante_m'] for r in _por_tipo(regs, 'nao_alocada'))
+    assert alocado + restante == pytest.approx(2 * LINHA['comprimento'])
+
+
+def test_linhas_do_pedido_reaproveita_por_ocorrencia():
+    a = servidor._linhas_do_pedido([dict(LINHA), dict(LINHA)])
+    b = servidor._linhas_do_pedido([dict(LINHA), dict(LINHA)])
+    assert a[0] is not a[1]
+    assert a[0] is b[0] and a[1] is b[1]
+
+
+def test_lotes_repartem_todas_as_bobinas():
+    bobinas = [dict(BOBINA, largura=w) for w in (1.0, 3.0, 2.0, 2.5, 0.5)]
+    lotes = servidor._lotes(bobinas, 2)
+    assert sorted(i for lote in lotes for i in lote) == [1, 2, 3, 4, 5]
+    assert [lote[0] for lote in lotes] == [2, 4]   # as mais largas abrem cada lote
+    assert servidor._lotes(bobinas, 10) == [[2], [4], [3], [1], [5]]
+
+
+def test_prazo_vencido_libera_o_trabalhador():
+    from core import AlocadorBobinagemReal, PrazoEsgotado
+    from models import Bobina, Linha
+
+    assert servidor._planejar_lote([1], [BOBINA], [dict(LINHA)], False, prazo=time.time() - 1.0) == []
+    with pytest.raises(PrazoEsgotado):
+        AlocadorBobinagemReal().alocar_em_bobina(Bobina(3.0, 1.0, 2.0, 30.0), [Linha("L1", 100.0, 400.0, 50.0, 0.4)],
+                                                  prazo=time.time() - 1.0)
+    # prazo folgado: mesmo resultado que sem prazo
+    com = servidor._planejar_lote([1], [BOBINA], [dict(LINHA)], False, prazo=time.time() + 60.0)
+    assert com == servidor._planejar_lote([1], [BOBINA], [dict(LINHA)], False)